@@ -0,0 +1,92 @@
+import argparse
+import re
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import openpyxl
+import pandas as pd
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(Path.joinpath(REPO, 'utils')))
+
+from cleaning import align_hyperlinks, extract_zip_codes, read_hyperlinks, read_workbook
+
+
+# Previous implementations from campaign_finance_cleaning.py / election25.py
+def legacy_hyperlinks(excel_file_path):
+    wb = openpyxl.load_workbook(excel_file_path)
+    sheet = wb.active
+    hyperlinks = []
+    for row in sheet.iter_rows(min_row=1, max_col=1, values_only=False):
+        cell = row[0]
+        if cell.hyperlink:
+            hyperlinks.append(cell.hyperlink.target)
+        else:
+            hyperlinks.append(None)
+    return hyperlinks
+
+
+# election25.py parsed the workbook three times: two read_excel calls and a
+# full openpyxl load for the hyperlinks
+def legacy_load(excel_file_path):
+    pd.read_excel(excel_file_path, engine='openpyxl')
+    df = pd.read_excel(excel_file_path)
+    return df, legacy_hyperlinks(excel_file_path)
+
+
+def legacy_zip_code(address):
+    if pd.notna(address):
+        match = re.search(r'\b\d{5}\b', address)
+        if match:
+            return match.group(0)
+    return None
+
+
+def legacy_align(clean_df, hyperlinks):
+    clean_hyperlinks = []
+    link_idx = 0
+    for i in range(len(clean_df)):
+        while link_idx < len(hyperlinks) and hyperlinks[link_idx] is None:
+            link_idx += 1
+        if link_idx < len(hyperlinks):
+            clean_hyperlinks.append(hyperlinks[link_idx])
+            link_idx += 1
+        else:
+            clean_hyperlinks.append(None)
+    return clean_hyperlinks
+
+
+# Wall time and peak traced memory of one call
+def measure(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+parser = argparse.ArgumentParser(description='Compare the legacy and vectorized cleaning steps.')
+parser.add_argument('excel', nargs='?', default=str(Path.joinpath(REPO, 'data', 'election25.xlsx')))
+args = parser.parse_args()
+
+df = pd.read_excel(args.excel)
+clean_df = df[df['Report Id:'].notna()]
+names = df['Name:'].astype(object)
+
+legacy_links, *legacy_read = measure(legacy_hyperlinks, args.excel)
+links, *new_read = measure(read_hyperlinks, args.excel)
+steps = [
+    ('load', measure(legacy_load, args.excel)[1:], measure(read_workbook, args.excel)[1:]),
+    ('hyperlinks', legacy_read, new_read),
+    ('zip codes', measure(names.apply, legacy_zip_code)[1:], measure(extract_zip_codes, names)[1:]),
+    ('alignment', measure(legacy_align, clean_df, legacy_links)[1:], measure(align_hyperlinks, clean_df, links)[1:]),
+]
+
+print(f"{len(df)} rows, {sum(link is not None for link in legacy_links)} hyperlinks")
+print(f"{'step':<12}{'legacy s':>10}{'new s':>10}{'speedup':>9}{'legacy MB':>11}{'new MB':>9}")
+for name, (legacy_s, legacy_mb), (new_s, new_mb) in steps:
+    print(f"{name:<12}{legacy_s:>10.3f}{new_s:>10.3f}{legacy_s / new_s:>8.1f}x{legacy_mb:>11.1f}{new_mb:>9.1f}")
@@ -0,0 +1,86 @@
+import argparse
+import calendar
+import sys
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+import pandas as pd
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(Path.joinpath(REPO, 'src')))
+
+from dates import derive_calendar_columns, parse_date_column
+
+DATE_COLUMNS = ['Election Date:', 'TransDate:', 'CreatedDt:']
+
+
+# Previous implementation from syntax_date_updates.ipynb: inferred formats and
+# a Python call per row for each month name
+def legacy_dates(df):
+    df = df.copy()
+    df['Election Date:'] = pd.to_datetime(df['Election Date:'], format='%m/%d/%y', errors='coerce')
+    df['TransDate:'] = pd.to_datetime(df['TransDate:'], errors='coerce')
+    df['CreatedDt:'] = pd.to_datetime(df['CreatedDt:'], errors='coerce')
+    df['TransDate:'] = df['TransDate:'].dt.normalize()
+    df['CreatedDt:'] = df['CreatedDt:'].dt.normalize()
+    for prefix, column in [('Election', 'Election Date:'), ('Created', 'CreatedDt:'), ('Trans', 'TransDate:')]:
+        df[f'{prefix} Year'] = df[column].dt.year
+        df[f'{prefix} Month'] = df[column].dt.month
+        df[f'{prefix} Day'] = df[column].dt.day
+    for prefix in ['Election', 'Created', 'Trans']:
+        df[f'{prefix} Month'] = df[f'{prefix} Month'].apply(
+            lambda x: calendar.month_name[int(x)] if pd.notnull(x) else None)
+        df[f'{prefix} Year'] = df[f'{prefix} Year'].astype('Int64')
+        df[f'{prefix} Day'] = df[f'{prefix} Day'].astype('Int64')
+    return df
+
+
+def new_dates(df):
+    df = df.copy()
+    for column in DATE_COLUMNS:
+        df[column] = parse_date_column(df[column])
+    return derive_calendar_columns(df)
+
+
+# Wall time of one call, and its peak traced memory from a second call
+# (tracing slows the allocation-heavy code down)
+def measure(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+parser = argparse.ArgumentParser(description='Compare the notebook and vectorized date derivation.')
+parser.add_argument('export', nargs='?', default=str(Path.joinpath(REPO, 'data', 'campaignfinancedata01202025.csv')),
+                    help='Raw city export CSV')
+parser.add_argument('--copies', type=int, default=1, help='Stack this many copies of the export (default: 1)')
+args = parser.parse_args()
+
+raw = pd.read_csv(args.export, dtype=str, usecols=DATE_COLUMNS)
+raw = pd.concat([raw] * args.copies, ignore_index=True)
+
+# the notebook's per-element dateutil fallback warns on every call
+warnings.filterwarnings('ignore', 'Could not infer format')
+legacy, legacy_s, legacy_mb = measure(legacy_dates, raw)
+new, new_s, new_mb = measure(new_dates, raw)
+
+# Same dates and calendar columns; month names as strings
+for column in legacy.columns:
+    expected = legacy[column]
+    actual = new[column].astype(object) if column.endswith('Month') else new[column]
+    if not expected.equals(actual.where(actual.notna(), expected)) or not expected.isna().equals(actual.isna()):
+        raise SystemExit(f"{column} differs from the notebook result")
+
+months = [f'{prefix} Month' for prefix in ['Election', 'Created', 'Trans']]
+print(f"{len(raw)} rows, {sum(raw[column].nunique() for column in DATE_COLUMNS)} distinct date values")
+print(f"{'':<10}{'s':>8}{'peak MB':>10}{'month MB':>10}")
+for name, frame, seconds, peak in [('notebook', legacy, legacy_s, legacy_mb), ('new', new, new_s, new_mb)]:
+    print(f"{name:<10}{seconds:>8.3f}{peak:>10.1f}{frame[months].memory_usage(deep=True).sum() / 2**20:>10.1f}")
+print(f"speedup {legacy_s / new_s:.1f}x")
@@ -0,0 +1,68 @@
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+SRC = Path.joinpath(REPO, 'src')
+
+# Each loader runs in a fresh interpreter so timings include a cold start and
+# peak RSS is not shared between runs. 'baseline' is the loader the app had
+# before the store (kept here as it was, inferring date formats); 'csv' is
+# today's CSV fallback; 'parquet' reads the store the way the app does, only
+# the columns it keeps, and 'parquet-all' reads every column.
+LOADERS = {
+    'baseline': 'baseline_load_csv(DATA)',
+    'csv': 'load_csv(DATA)',
+    'parquet': 'load_dataset(DATA, memory_map=True, columns=SNAPSHOT_COLUMNS)',
+    'parquet-all': 'load_dataset(DATA, memory_map=True)',
+}
+
+CHILD = """
+import json, resource, sys, time
+from pathlib import Path
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+import pandas as pd
+from datastore import CSV_FILE, SNAPSHOT_COLUMNS, load_csv, load_dataset
+DATA = Path({data!r})
+
+def baseline_load_csv(data_dir):
+    df = pd.read_csv(Path.joinpath(data_dir, CSV_FILE))
+    df['TransDate:'] = pd.to_datetime(df['TransDate:'], errors='coerce')
+    return df
+
+import_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+df = {call}
+df['TransDate:'].max()
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    'seconds': elapsed,
+    'rows': len(df),
+    'frame_mb': df.memory_usage(deep=True).sum() / 2**20,
+    'import_rss_mb': import_rss,
+    'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}}))
+"""
+
+
+def run(call, data_dir):
+    out = subprocess.run([sys.executable, '-c', CHILD.format(src=str(SRC), data=str(data_dir), call=call)],
+                         check=True, capture_output=True, text=True)
+    return json.loads(out.stdout)
+
+
+parser = argparse.ArgumentParser(description='Compare CSV and Parquet dataset loaders.')
+parser.add_argument('--repeat', type=int, default=5)
+parser.add_argument('--data-dir', default=str(Path.joinpath(REPO, 'data')),
+                    help='Directory with campaign_finance.csv and its store (default: data/)')
+args = parser.parse_args()
+
+# 'load RSS' is the peak RSS above what the imports alone use
+print(f"{'loader':<14}{'best s':>10}{'frame MB':>10}{'peak RSS MB':>13}{'load RSS MB':>13}")
+for name, call in LOADERS.items():
+    results = [run(call, args.data_dir) for _ in range(args.repeat)]
+    best = min(results, key=lambda r: r['seconds'])
+    print(f"{name:<14}{best['seconds']:>10.3f}{best['frame_mb']:>10.1f}{best['peak_rss_mb']:>13.1f}"
+          f"{best['peak_rss_mb'] - best['import_rss_mb']:>13.1f}")
@@ -0,0 +1,93 @@
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+SRC = Path.joinpath(REPO, 'src')
+
+# Environment for gunicorn.conf.py: 'preload' loads the dataset in the master
+# before any worker serves; 'lazy' serves the layout at once and loads the
+# dataset in each worker in the background (see PRELOAD_DATA)
+MODES = {
+    'preload': {'PRELOAD_DATA': '1'},
+    'lazy': {'PRELOAD_DATA': '0'},
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+# Seconds from `start` until `check` returns True
+def wait_for(check, start, timeout=300):
+    while time.perf_counter() - start < timeout:
+        try:
+            if check():
+                return time.perf_counter() - start
+        except (OSError, urllib.error.HTTPError):
+            pass
+        time.sleep(0.02)
+    raise RuntimeError("Server did not come up")
+
+
+def layout_served(url):
+    return urllib.request.urlopen(url + '_dash-layout').status == 200
+
+
+def data_loaded(url):
+    return json.load(urllib.request.urlopen(url + 'metrics'))['version'] is not None
+
+
+# Start a one-worker gunicorn from scratch and time how long until it serves
+# the page layout (ready) and until its dataset is loaded
+def cold_start(mode):
+    port = free_port()
+    url = f'http://127.0.0.1:{port}/'
+    cmd = [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}',
+           '--workers', '1', 'app:server']
+    start = time.perf_counter()
+    master = subprocess.Popen(cmd, cwd=SRC, env=dict(os.environ, **MODES[mode]),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        ready = wait_for(lambda: layout_served(url), start)
+        loaded = wait_for(lambda: data_loaded(url), start)
+        return ready, loaded
+    finally:
+        master.terminate()
+        master.wait()
+
+
+# Time to import app.py in a fresh interpreter (no data is read at import)
+def import_time():
+    code = 'import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)'
+    out = subprocess.run([sys.executable, '-c', code], cwd=SRC, capture_output=True, text=True, check=True)
+    return float(out.stdout)
+
+
+parser = argparse.ArgumentParser(description='Measure worker cold start against a budget.')
+parser.add_argument('--runs', type=int, default=3)
+parser.add_argument('--budget-ms', type=float, default=float(os.environ.get('COLD_START_BUDGET_MS', 3000)),
+                    help='Most milliseconds until the lazy mode serves the layout (default: 3000)')
+args = parser.parse_args()
+
+print(f"import app: {statistics.median(import_time() for _ in range(args.runs)) * 1000:.0f} ms (median)")
+print(f"{'mode':<10}{'ready ms':>10}{'loaded ms':>11}  (median of {args.runs})")
+results = {}
+for mode in MODES:
+    runs = [cold_start(mode) for _ in range(args.runs)]
+    results[mode] = [statistics.median(run[i] for run in runs) * 1000 for i in range(2)]
+    print(f"{mode:<10}{results[mode][0]:>10.0f}{results[mode][1]:>11.0f}")
+
+ready = results['lazy'][0]
+print(f"budget {args.budget_ms:.0f} ms: {'ok' if ready <= args.budget_ms else 'EXCEEDED'}")
+sys.exit(0 if ready <= args.budget_ms else 1)
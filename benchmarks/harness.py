@@ -0,0 +1,277 @@
+import argparse
+import inspect
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO = Path(__file__).resolve().parents[1]
+SRC = Path.joinpath(REPO, 'src')
+UTILS = Path.joinpath(REPO, 'utils')
+sys.path.insert(0, str(SRC))
+sys.path.insert(0, str(UTILS))
+
+# Real export the synthetic data copies its schema and distributions from
+REFERENCE = Path.joinpath(REPO, 'data', 'cf_update2025.csv')
+HISTORY = Path.joinpath(REPO, 'benchmarks', 'history.json')
+
+CALLBACK_NAMES = [
+    'update_graph',
+    'update_timeseries',
+    'updated_expenditures_timeseries',
+    'update_top_donors_aggregated_table',
+    'update_average_donation_table',
+]
+TABLE_CALLBACKS = ['update_top_donors_aggregated_table', 'update_average_donation_table']
+TIMESERIES_CALLBACKS = ['update_timeseries', 'updated_expenditures_timeseries']
+
+
+# Synthetic transactions with the schema of cf_update2025.csv, `scale` times
+# its size. Rows are resampled from the reference so contact type, strVal,
+# candidate and amount keep their joint distribution; history spreads over
+# more election cycles (and so more candidates) as the scale grows, and donors
+# are drawn Zipf-style so a few give often and most give once.
+def synthetic_frame(scale, seed=0):
+    from datastore import parse_dates
+    from dates import derive_calendar_columns
+
+    rng = np.random.default_rng(seed)
+    reference = parse_dates(pd.read_csv(REFERENCE))
+    n = len(reference) * scale
+    df = reference.sample(n, replace=True, random_state=seed).reset_index(drop=True)
+
+    # Election cycles two years apart, one per sqrt(scale)
+    cycles = max(1, int(round(np.sqrt(scale))))
+    cycle = rng.integers(0, cycles, n)
+    offset = pd.to_timedelta(cycle * 730, unit='D')
+    for column in ['Election Date:', 'TransDate:', 'CreatedDt:']:
+        df[column] = df[column] - offset
+    later = cycle > 0
+    election_year = df['Election Date:'].dt.year.astype('Int64').astype(str)
+    df.loc[later, 'Cand/Committee:'] = df.loc[later, 'Cand/Committee:'] + ' (' + election_year[later] + ')'
+    df['FilerName'] = df['Cand/Committee:']
+
+    # Donors: heavy-tailed repeat giving over a pool that grows with the data
+    contributors = df['Contact Type:'] == 'Contributor'
+    pool = max(1, int(contributors.sum() * 0.75))
+    donor = (rng.zipf(1.6, n) - 1) % pool
+    zip_code = 78200 + donor % 100
+    df.loc[contributors, 'Name:'] = [f'Donor {d:07d}' for d in donor[contributors.to_numpy()]]
+    df['ZipCode'] = zip_code
+    df['Amount:'] = (df['Amount:'] * rng.lognormal(0, 0.1, n)).round(2)
+
+    df['Id'] = np.arange(n, dtype=float)
+    df['ReportId'] = (df['ReportId'] + cycle * 10000).astype(float)
+    df['Count:'] = np.arange(1, n + 1, dtype=float)
+    return derive_calendar_columns(df)
+
+
+# Median and p95 latency of `func(*args)` over `repeat` calls
+def time_call(func, args, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return statistics.median(times), times[min(len(times) - 1, int(len(times) * 0.95))]
+
+
+def peak_memory(func, args):
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+def record(results, name, func, args, repeat):
+    median, p95 = time_call(func, args, repeat)
+    results[name] = {'median_ms': median * 1000, 'p95_ms': p95 * 1000, 'peak_mb': peak_memory(func, args)}
+
+
+# Callback inputs: the default view, all years, and a few candidates (by id)
+def callback_inputs(df):
+    top = [int(candidate_id) for candidate_id in df['Candidate Id'].value_counts().index[:3]]
+    return {
+        '2025': (2025, None),
+        'all-years': (None, None),
+        '2025-top3': (2025, top),
+    }
+
+
+# `func` with `cache` emptied before each call
+def uncached(cache, func):
+    def call(*args):
+        cache.clear()
+        return func(*args)
+    return call
+
+
+def bench_callbacks(app, df, repeat):
+    from aggregates import AggregateCube
+    from candidates import Candidates, assign_candidate_ids
+    from dataset import Snapshot
+    from donors import DonorIndex, assign_donor_ids
+
+    df, candidates = assign_candidate_ids(df)
+    df, dimension = assign_donor_ids(df)
+    app.dataset.current = Snapshot(df, AggregateCube.from_transactions(df), (), DonorIndex(df, dimension),
+                                   Candidates(candidates))
+    results = {}
+    for name in CALLBACK_NAMES:
+        # the callback without its instrumentation and result cache; the
+        # table builders the paging callbacks call are cached too, so the
+        # cache is emptied before every call
+        func = uncached(app.callback_cache, inspect.unwrap(getattr(app, name)))
+        for label, (year, candidates) in callback_inputs(df).items():
+            args = (year, candidates)
+            if name == 'update_top_donors_aggregated_table':
+                args = (year, candidates[0] if candidates else None)
+            if name in TABLE_CALLBACKS:
+                # first page of the default sort, building the full table
+                args += (0, 10, [], '')
+            if name in TIMESERIES_CALLBACKS:
+                # no date range: the whole history
+                args += (None,)
+            record(results, f'{name}[{label}]', func, args, repeat)
+
+    # the CLIENTSIDE_GRAPHS payload, and its size against the byte budget
+    from clientside import graph_payload, payload_size
+    record(results, 'graph_payload', graph_payload, (app.dataset.current,), repeat)
+    results['graph_payload']['payload_kb'] = payload_size(graph_payload(app.dataset.current)) / 1024
+    return results
+
+
+# The rollup queries behind the callbacks on each query backend, over the
+# snapshot bench_callbacks loaded
+def bench_queries(snapshot, repeat):
+    from query import PandasBackend, SQLiteBackend
+
+    backends = {'pandas': PandasBackend(snapshot.cube), 'sqlite': SQLiteBackend.from_cube(snapshot.cube)}
+    results = {}
+    for backend_name, backend in backends.items():
+        for label, (year, candidates) in callback_inputs(snapshot.df).items():
+            record(results, f'query.daily[{label}, {backend_name}]', backend.daily,
+                   (year, candidates, 'Contributor'), repeat)
+            record(results, f'query.donors[{label}, {backend_name}]', backend.donors, (year, candidates), repeat)
+    return results
+
+
+def bench_cleaning(raw, prepared, repeat):
+    from aggregates import AggregateCube
+    from cleaning import extract_zip_codes
+    from candidates import assign_candidate_ids
+    from datastore import prepare
+    from donors import DonorIndex, assign_donor_ids
+    from dates import derive_calendar_columns
+    from exports import EXPORT_SCHEMA, validate_chunk
+    from memo import dataset_version
+
+    names = raw['Name:'].astype(str) + '\nSan Antonio, TX    ' + raw['ZipCode'].astype(str)
+    results = {}
+    record(results, 'extract_zip_codes', extract_zip_codes, (names,), repeat)
+    # export columns as read from a CSV: all strings
+    export = pd.read_csv(io.StringIO(raw[list(EXPORT_SCHEMA)].to_csv(index=False)), dtype=str)
+    record(results, 'validate_chunk', validate_chunk, (export,), repeat)
+    record(results, 'derive_calendar_columns', derive_calendar_columns, (raw,), repeat)
+    record(results, 'prepare', prepare, (raw,), repeat)
+    record(results, 'assign_candidate_ids', assign_candidate_ids, (prepared,), repeat)
+    prepared, _ = assign_candidate_ids(prepared)
+    record(results, 'assign_donor_ids', assign_donor_ids, (prepared,), repeat)
+    prepared, dimension = assign_donor_ids(prepared)
+    record(results, 'DonorIndex', DonorIndex, (prepared, dimension), repeat)
+    index = DonorIndex(prepared, dimension)
+    # the donor with the most transactions
+    busiest = int(prepared['Donor Id'].value_counts().index[0])
+    record(results, 'DonorIndex.donations', index.donations, (busiest,), repeat)
+    record(results, 'AggregateCube.from_transactions', AggregateCube.from_transactions, (prepared,), repeat)
+    record(results, 'dataset_version', dataset_version, (prepared,), repeat)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    if Path(path).exists():
+        return json.loads(Path(path).read_text())
+    return []
+
+
+# Percent change of each median against the latest earlier run at the same scale
+def compare(entry, history):
+    previous = [run for run in history if run['scale'] == entry['scale']]
+    if not previous:
+        return
+    baseline = previous[-1]
+    print(f"  vs {baseline['commit']} ({baseline['timestamp']}):")
+    for name, result in entry['results'].items():
+        before = baseline['results'].get(name)
+        if before:
+            change = (result['median_ms'] - before['median_ms']) / before['median_ms'] * 100
+            print(f"    {name:<60}{change:+8.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark dashboard callbacks and cleaning steps on synthetic data.')
+    parser.add_argument('--scales', type=int, nargs='+', default=[10, 100],
+                        help='Multiples of the reference export size (default: 10 100)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--history', default=str(HISTORY), help='JSON file runs are appended to')
+    parser.add_argument('--no-save', action='store_true', help='Do not append results to the history')
+    args = parser.parse_args()
+
+    # Import the app against a small synthetic dataset so no real data is needed
+    with tempfile.TemporaryDirectory() as data_dir:
+        synthetic_frame(1).to_csv(Path.joinpath(Path(data_dir), 'campaign_finance.csv'), index=False)
+        os.environ['CAMPAIGN_FINANCE_DATA'] = data_dir
+        os.environ['DATA_WATCH_INTERVAL'] = '0'
+        import app
+
+    from datastore import prepare
+
+    history = load_history(args.history)
+    for scale in args.scales:
+        raw = synthetic_frame(scale)
+        prepared = prepare(raw)
+        results = bench_callbacks(app, prepared, args.repeat)
+        results.update(bench_queries(app.dataset.current, args.repeat))
+        results.update(bench_cleaning(raw, prepared, args.repeat))
+
+        entry = {
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'scale': scale,
+            'rows': len(raw),
+            'results': results,
+        }
+        print(f"scale {scale}x ({len(raw)} rows)")
+        print(f"  {'step':<60}{'median ms':>11}{'p95 ms':>10}{'peak MB':>9}")
+        for name, result in results.items():
+            size = f"{result['payload_kb']:>9.0f} KB" if 'payload_kb' in result else ''
+            print(f"  {name:<60}{result['median_ms']:>11.2f}{result['p95_ms']:>10.2f}{result['peak_mb']:>9.1f}{size}")
+        compare(entry, history)
+        history.append(entry)
+
+    if not args.no_save:
+        Path(args.history).write_text(json.dumps(history, indent=2))
+
+
+if __name__ == '__main__':
+    main()
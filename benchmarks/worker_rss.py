@@ -0,0 +1,91 @@
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import psutil
+
+REPO = Path(__file__).resolve().parents[1]
+SRC = Path.joinpath(REPO, 'src')
+
+# Environment for gunicorn.conf.py: 'per-worker' has each worker load its own
+# copy of the dataset after forking (PRELOAD_DATA=0); 'preload' loads it once
+# in the master
+MODES = {
+    'per-worker': {'PRELOAD_DATA': '0'},
+    'preload': {'PRELOAD_DATA': '1'},
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(url, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url).read()
+            return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError(f"Server at {url} did not come up")
+
+
+# Workers load in the background with PRELOAD_DATA=0: wait until /metrics has
+# reported a loaded dataset from every one of them
+def wait_until_loaded(url, pids, timeout=300):
+    loaded = set()
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        worker = json.load(urllib.request.urlopen(url))
+        if worker['version'] is not None:
+            loaded.add(worker['pid'])
+        if loaded >= pids:
+            return
+        time.sleep(0.1)
+    raise RuntimeError("Workers did not finish loading the dataset")
+
+
+# Start gunicorn, let every worker serve a few requests, then read its memory
+def measure(mode, workers, requests):
+    port = free_port()
+    url = f'http://127.0.0.1:{port}/'
+    cmd = [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}',
+           '--workers', str(workers), 'app:server']
+    master = subprocess.Popen(cmd, cwd=SRC, env=dict(os.environ, **MODES[mode]),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_up(url)
+        children = psutil.Process(master.pid).children()
+        while len(children) < workers:
+            time.sleep(0.5)
+            children = psutil.Process(master.pid).children()
+        wait_until_loaded(url + 'metrics', {child.pid for child in children})
+        for _ in range(requests):
+            urllib.request.urlopen(url).read()
+        return [child.memory_full_info() for child in children]
+    finally:
+        master.terminate()
+        master.wait()
+
+
+parser = argparse.ArgumentParser(description='Measure per-worker memory with and without preload.')
+parser.add_argument('--workers', type=int, default=4)
+parser.add_argument('--requests', type=int, default=20)
+args = parser.parse_args()
+
+print(f"{'mode':<12}{'workers':>8}{'RSS MB':>10}{'PSS MB':>10}{'USS MB':>10}  (mean per worker)")
+for mode in MODES:
+    infos = measure(mode, args.workers, args.requests)
+    rss = sum(info.rss for info in infos) / len(infos) / 2**20
+    pss = sum(info.pss for info in infos) / len(infos) / 2**20
+    uss = sum(info.uss for info in infos) / len(infos) / 2**20
+    print(f"{mode:<12}{len(infos):>8}{rss:>10.1f}{pss:>10.1f}{uss:>10.1f}")
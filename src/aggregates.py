@@ -0,0 +1,141 @@
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from candidates import CANDIDATE_ID
+from donors import DONOR_ID
+from metrics import metrics
+
+# Dimensions the graph callbacks filter on, rolled up to one row per day.
+# Candidates and donors are integer codes (see candidates.py and donors.py).
+DAILY_KEYS = ['Election Year', CANDIDATE_ID, 'Contact Type:', 'strVal', 'TransDate:']
+# Dimensions the donor tables need (contributors only)
+DONOR_KEYS = ['Election Year', CANDIDATE_ID, DONOR_ID]
+# Text keys kept as categoricals in the rollups
+CATEGORICAL_KEYS = ['Contact Type:', 'strVal']
+
+
+# Sum, non-null count and row count of 'Amount:' for each group of keys.
+# 'count' backs averages (mean skips missing amounts), 'size' backs the
+# "Number of Donations" columns (which count every row).
+def _aggregate(df, keys):
+    return df.groupby(keys, dropna=False, observed=True, sort=False)['Amount:'].agg(
+        ['sum', 'count', 'size']
+    ).reset_index()
+
+
+# Combine two rollups over the same keys; every measure is additive
+def _combine(left, right, keys):
+    combined = pd.concat([frame for frame in (left, right) if not frame.empty] or [left], ignore_index=True)
+    for column in CATEGORICAL_KEYS:
+        if column in keys:
+            combined[column] = combined[column].astype('category')
+    return combined.groupby(keys, dropna=False, observed=True, sort=False)[['sum', 'count', 'size']].sum().reset_index()
+
+
+# Per group of `by` in a rollup with one row per (`by`, `item`) pair (a single
+# year's donor rollup): the totals of each measure and the `item` with the
+# largest amount. Ties go to the item ranked first by `item_ranks` (an array
+# indexed by item id, e.g. name order as a groupby on the names would give),
+# or to the lowest id. One grouped pass gives the totals and a scatter-max over
+# the same rows the top item, with no second groupby, sort or merge. Rows
+# without an item count towards the totals but are never the top; groups with
+# no item at all are left out. Columns are `by`, 'sum', 'count', 'size' and
+# 'top', in `by` order.
+def grouped_top(frame, by, item, item_ranks=None):
+    top = frame.groupby(by, observed=True)[['sum', 'count', 'size']].sum().reset_index()
+
+    rows = (frame[by].notna() & frame[item].notna()).to_numpy()
+    position = np.searchsorted(top[by].to_numpy(dtype='int64'), frame[by].to_numpy(dtype='int64', na_value=-1)[rows])
+    items = frame[item].to_numpy(dtype='int64', na_value=-1)[rows]
+    amounts = frame['sum'].to_numpy()[rows]
+    best = np.full(len(top), -np.inf)
+    np.maximum.at(best, position, amounts)
+    is_best = amounts == best[position]
+    keys = items if item_ranks is None else np.asarray(item_ranks)[items]
+    first = np.full(len(top), np.iinfo('int64').max)
+    np.minimum.at(first, position[is_best], keys[is_best])
+    winner = is_best & (keys == first[position])
+    top_item = np.full(len(top), -1, dtype='int64')
+    top_item[position[winner]] = items[winner]
+    top['top'] = top_item
+    return top[np.isfinite(best)]
+
+
+# Positions of the k largest `values` (missing values count as smallest), in
+# their original order; ties at the cut go to the lowest `ranks` (e.g. name
+# order), else the earliest position. Picked by partial selection rather than
+# a sort of every value. Every position when k is None.
+def largest(values, k, ranks=None):
+    if k is None or k >= len(values):
+        return np.arange(len(values))
+    values = np.nan_to_num(np.asarray(values, dtype='float64'), nan=-np.inf)
+    threshold = np.partition(values, len(values) - k)[len(values) - k]
+    above = np.flatnonzero(values > threshold)
+    tied = np.flatnonzero(values == threshold)
+    if ranks is not None:
+        tied = tied[np.argsort(np.asarray(ranks)[tied], kind='stable')]
+    return np.sort(np.concatenate([above, tied[:k - len(above)]]))
+
+
+# Pre-split an aggregate by election year so a year lookup is a dict access
+def _split_by_year(agg):
+    return {year: frame for year, frame in agg.groupby('Election Year', observed=True)}
+
+
+class AggregateCube:
+    """Load-time rollups of the transaction data used by the dashboard callbacks."""
+
+    def __init__(self, daily, donors):
+        self.daily = daily
+        self.donors = donors
+        self._daily_by_year = _split_by_year(self.daily)
+        self._donors_by_year = _split_by_year(self.donors)
+
+    @classmethod
+    def from_transactions(cls, df):
+        daily = df[DAILY_KEYS[:-1] + ['Amount:']].copy()
+        daily['TransDate:'] = df['TransDate:'].dt.normalize()
+        contributors = df[df['Contact Type:'] == 'Contributor']
+        return cls(_aggregate(daily, DAILY_KEYS), _aggregate(contributors, DONOR_KEYS))
+
+    # Rollups persisted next to the store by the build and ingest steps
+    @classmethod
+    def load(cls, path):
+        return cls(pd.read_parquet(Path.joinpath(Path(path), 'daily.parquet')),
+                   pd.read_parquet(Path.joinpath(Path(path), 'donors.parquet')))
+
+    def save(self, path):
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        self.daily.to_parquet(Path.joinpath(path, 'daily.parquet'), index=False)
+        self.donors.to_parquet(Path.joinpath(path, 'donors.parquet'), index=False)
+
+    # New cube with the rollups of another (e.g. a batch of new filings) added in
+    def merged(self, other):
+        return AggregateCube(_combine(self.daily, other.daily, DAILY_KEYS),
+                             _combine(self.donors, other.donors, DONOR_KEYS))
+
+    # Daily rollup for a year (None for all years), optionally narrowed to
+    # candidate ids, a contact type and/or a strVal
+    def daily_slice(self, year=None, candidates=None, contact_type=None, str_val=None):
+        if year:
+            frame = self._daily_by_year.get(year, self.daily.iloc[:0])
+        else:
+            frame = self.daily
+        metrics.count_scanned(len(frame))
+        if candidates:
+            frame = frame[frame[CANDIDATE_ID].isin(candidates)]
+        if contact_type:
+            frame = frame[frame['Contact Type:'] == contact_type]
+        if str_val:
+            frame = frame[frame['strVal'] == str_val]
+        return frame
+
+    # Donor x candidate rollup of contributions for a single election year
+    def donor_slice(self, year, candidates=None):
+        frame = self._donors_by_year.get(year, self.donors.iloc[:0])
+        metrics.count_scanned(len(frame))
+        if candidates:
+            frame = frame[frame[CANDIDATE_ID].isin(candidates)]
+        return frame
@@ -1,378 +1,624 @@
-from dash import Dash, dash_table, dcc, html, Input, Output, State
+from dash import ClientsideFunction, Dash, dash_table, dcc, html, Input, Output, State
+from dash.exceptions import PreventUpdate
+from flask import abort, g, has_request_context, jsonify, request
 from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
+import hashlib
+import hmac
 import logging
+import os
 import dash_bootstrap_components as dbc
 import pandas as pd
 
-REPO = Path(__file__).resolve().parents[1]
-DATA = Path.joinpath(REPO, 'data')
-
-df = pd.read_csv(Path.joinpath(DATA, 'campaign_finance.csv'))
+from aggregates import grouped_top, largest
+from candidates import CANDIDATE_ID
+from dataset import DatasetHolder, Dimensions
+from donors import DONOR_ID
+from memo import LRUCache, make_cache, memoize
+from metrics import metrics
+from responses import compress_response, not_modified, set_validators
+from series import cumulative_traces, from_day
+from tables import EMPTY, PagedTable
 
-# Convert TransDate: to date time
-df['TransDate:'] = pd.to_datetime(df['TransDate:'], errors='coerce')
-# Add last transaction date and date last downloaded
-last_transaction_date = df['TransDate:'].max().strftime('%m/%d/%Y')
-data_last_download = "January 20, 2025"
+REPO = Path(__file__).resolve().parents[1]
+DATA = Path(os.environ.get('CAMPAIGN_FINANCE_DATA', Path.joinpath(REPO, 'data')))
+
+# Current dataset (columnar store built by utils/build_store.py, falling back
+# to campaign_finance.csv) with its rollups, dates and dropdown options.
+# Loaded on first use, not at import (see gunicorn.conf.py), and swapped as a
+# whole when new data lands in DATA.
+dataset = DatasetHolder(DATA)
+
+# Callback results keyed on inputs and dataset version (LRU, optionally file-backed)
+callback_cache = make_cache()
+cached = memoize(callback_cache, lambda: dataset.current.version)
+
+# Results for the old version can never be hit again. The in-process cache
+# is emptied; a file-backed one is shared with workers that may not have
+# swapped yet, so its old entries are left to age out of its LRU.
+@dataset.on_swap
+def clear_callback_cache(snapshot):
+    if isinstance(callback_cache, LRUCache):
+        callback_cache.clear()
+    cached_layout.cache_clear()
+
+# Most rows in each donor table (the first rows in the table's own order);
+# 0 keeps every donor or candidate
+DONOR_TABLE_ROWS = int(os.environ.get('DONOR_TABLE_ROWS', 0)) or None
+
+# Build the three graphs in the browser from a payload shipped once with the
+# layout (assets/graphs.js) instead of a server callback per interaction
+CLIENTSIDE_GRAPHS = os.environ.get('CLIENTSIDE_GRAPHS', '0') == '1'
 
 app = Dash(__name__, serve_locally=True)
 server = app.server
 
+# The layout changes only with the dataset or a new deploy of this module
+# (or a different CLIENTSIDE_GRAPHS setting), so its ETag is keyed on both
+LAYOUT_BUILD = hashlib.sha1(Path(__file__).read_bytes() + str(CLIENTSIDE_GRAPHS).encode()).hexdigest()[:8]
+
 logging.debug("Starting server...")
 
-app.layout = dbc.Container(
-    [
-        dbc.Row(
-            [
-                dbc.Col(
-                    html.Div(
-                        [
-                            html.Div(f"Data Last Downloaded: {data_last_download}"),
-                            html.Div(f"Date of Last Transaction: {last_transaction_date}")
-                        ],
-                        style={'text-align': 'right', 'fontSize': '14px', 'color': '#333333'}
-                    ),
-                    width=12
-                ),
-            ],
-            style={'marginBottom': '10px'}
-        ),
-         dbc.Row(
-            [
-                dbc.Col(
-                    html.H2("COSA Campaign Finance Data"),
-                    width=12,
-                    style={'text-align': 'center', 'font-weight': 'bold', 'color': '#333333'}
-                )
-            ],
-            justify="center",
-            align='center',
-            style={'marginBottom': '20px'}
-        ),
-        # Update with global dropdown
-        dbc.Row(
-            [
-                dbc.Col(
-                    dcc.Dropdown(
-                        options=[{'label': str(int(year)), 'value': int(year)} for year in sorted(df['Election Year'].dropna().unique())],
-                        id='global-year-dropdown',
-                        placeholder='Select Election Year',
-                        value=2025,
-                        style={'marginBottom': '10px'}
-                    ),
-                    width=6
-                ),
-                dbc.Col(
-                    dcc.Dropdown(
-                        options=[{'label': candidate, 'value': candidate} for candidate in sorted(df['Cand/Committee:'].unique())],
-                        id='global-candidate-dropdown',
-                        multi=True,
-                        placeholder='Select Candidate(s)',
-                        style={'marginBottom': '10px'}
+
+# Token the admin and metrics routes require as 'Authorization: Bearer ...'.
+# Without one they only answer requests from the loopback address, which
+# behind a reverse proxy on the same host is every request.
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+
+
+def require_admin():
+    if ADMIN_TOKEN:
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {ADMIN_TOKEN}'):
+            abort(403)
+    elif request.remote_addr not in ('127.0.0.1', '::1'):
+        abort(403)
+
+
+# Reload the dataset without restarting: at once in this worker, and in the
+# others when their watchers next poll (see RELOAD_FILE)
+@server.route('/admin/reload', methods=['POST'])
+def reload_dataset():
+    require_admin()
+    dataset.request_reload()
+    return jsonify({'status': 'reloading', 'version': dataset.current.version, 'pid': os.getpid()}), 202
+
+
+# Callback timings, response sizes and startup phases for this worker
+@server.route('/metrics')
+def serve_metrics():
+    require_admin()
+    return jsonify(dict(metrics.as_dict(), cache=callback_cache.stats(),
+                        version=dataset.current.version if dataset.loaded else None))
+
+
+# Summaries of the sampled callback profiles (METRICS_PROFILE_RATE)
+@server.route('/metrics/profiles')
+def serve_profiles():
+    require_admin()
+    return jsonify(list(metrics.profiles))
+
+
+# Compress callback, layout and static responses (runs after the hooks below)
+@server.after_request
+def compress(response):
+    return compress_response(response)
+
+
+def layout_etag(dimensions):
+    return f'{dimensions.version}-{LAYOUT_BUILD}'
+
+
+# Repeat visitors revalidate the layout: answer 304 before building it
+@server.before_request
+def layout_not_modified():
+    if request.path.endswith('/_dash-layout'):
+        dimensions = dataset.dimensions
+        return not_modified(layout_etag(dimensions), dimensions.last_modified)
+
+
+@server.after_request
+def layout_validators(response):
+    if request.path.endswith('/_dash-layout') and response.status_code == 200:
+        dimensions = g.get('layout_dimensions') or dataset.dimensions
+        set_validators(response, layout_etag(dimensions), dimensions.last_modified)
+    return response
+
+
+# Size of each serialized callback response, by output
+@server.after_request
+def record_response_size(response):
+    if request.path.endswith('/_dash-update-component') and not response.direct_passthrough:
+        body = request.get_json(silent=True) or {}
+        metrics.record_response(body.get('output', 'unknown'), len(response.get_data()))
+    return response
+
+
+# Layout for the current dimensions on each page load. Before the dataset has
+# loaded this comes from the dimensions saved by the last load, so a new
+# worker serves the page while the data is still being read.
+def serve_layout():
+    # the clientside graphs' data ships with the layout, so it waits for the load
+    snapshot = dataset.current if CLIENTSIDE_GRAPHS else None
+    dimensions = snapshot.dimensions if snapshot else dataset.dimensions
+    if has_request_context():
+        # validators must describe the dimensions the layout was built from
+        g.layout_dimensions = dimensions
+    return cached_layout(dimensions, snapshot)
+
+
+# Each version's layout is built once; cleared on swap so the old snapshot is
+# not kept alive
+@lru_cache(maxsize=2)
+def cached_layout(dimensions, snapshot=None):
+    with metrics.phase('layout build'):
+        return build_layout(dimensions, snapshot.graph_payload if snapshot else None)
+
+
+def build_layout(dimensions, graph_data=None):
+    return dbc.Container(
+        [
+            # Graph data for the clientside graphs (CLIENTSIDE_GRAPHS)
+            dcc.Store(id='graph-data', data=graph_data),
+            dbc.Row(
+                [
+                    dbc.Col(
+                        html.Div(
+                            [
+                                html.Div(f"Data Last Downloaded: {dimensions.data_last_download}"),
+                                html.Div(f"Date of Last Transaction: {dimensions.last_transaction_date}")
+                            ],
+                            style={'text-align': 'right', 'fontSize': '14px', 'color': '#333333'}
+                        ),
+                        width=12
                     ),
-                    width=6
-                ),
-            ],
-            style={'marginBottom': '20px'}
-        ),      
-        dbc.Row(
-            [
-                dbc.Col(
-                    html.H4("Total Contributions & Expenditures",
-                            style={'text-align': 'center',
-                                   'marginTop': '40px', 
-                                   'marginBottom': '15px',
-                                   'color': '#1s73e8'}),
-                            width=12
-                ),
-                dbc.Col(
-                    dcc.Graph(id='cand-committee-graph', config={'displayModeBar': False}),
-                    width=12,
-                    style={
-                        'border': '1px solid #e0e0e0',
-                        'padding': '20px',
-                        'box-shadow': '2px 2px 8px rbga(0,0,0,0.1)',
-                        'backgroundColor': 'white'
-                    }
-                ),
-            ],
-            style={'marginBottom': '30px'}
-        ),
-        dbc.Row(
-            [
-                dbc.Col(
-                    html.H4("Monetary Political Contributions to Candidates Over Time", style={'text-align': 'center',
-                                                                            'marginTop': '40px',
-                                                                            'marginBottom': '15px'}),
-                    width=12
-                ),
-                dbc.Col(
-                    dcc.Graph(id='timeseries-graph'),
-                    width=12,
-                    style={
-                        'border': '1px solid #e0e0e0',
-                        'padding': '20px',
-                        'box-shadow': '2px 2px 8px rbga(0,0,0,0.1)',
-                        'backgroundColor': 'white'
-                    }
-                ),
-            ],
-            style={'marginBottom': '30px'}
-        ),
-        # Expenditure Time Series Graph
-        dbc.Row(
-            [
-                dbc.Col(
-                    html.H4("Political Expenditures Over Time",
-                            style={'text-align': 'center', 'marginTop': '20px', 'marginBottom': '20px'}),
-                            width=12
-                ),
-                dbc.Col(
-                    dcc.Graph(id='expenditure-timeseries-graph'),
-                    width=12,
-                    style={
-                        'border': '1px solid #e0e0e0',
-                        'padding': '20px',
-                        'box-shadow': '2px 2px 8px rbga(0,0,0,0.1)',
-                        'backgroundColor': 'white'
-                    }
-                ),
-            ],
-            style={'marginBottom': '30px'}
-            
-        ),
-#         # Top Donors Table
-        dbc.Row(
-            [
-                dbc.Col(
-                    html.H4("Donors & Contributions",
-                            style={'text-align': 'center', 'marginTop': '20px', 'marginBottom': '20px'}),
-                            width=12
-                )
-            ]
-        ),
-        # Row with both tables and drop downs aligned and styled
-        dbc.Row(
-            [
-                dbc.Col(
-                    [
-                        html.H5("Average Donation to Candidates", style={'text-align': 'center', 'color': '#333333', 'marginBottom': '10px'}),
-                        # Election Year Dropdown for Average Donation Table
+                ],
+                style={'marginBottom': '10px'}
+            ),
+             dbc.Row(
+                [
+                    dbc.Col(
+                        html.H2("COSA Campaign Finance Data"),
+                        width=12,
+                        style={'text-align': 'center', 'font-weight': 'bold', 'color': '#333333'}
+                    )
+                ],
+                justify="center",
+                align='center',
+                style={'marginBottom': '20px'}
+            ),
+            # Update with global dropdown
+            dbc.Row(
+                [
+                    dbc.Col(
                         dcc.Dropdown(
-                            options=[{'label': str(int(year)), 'value': int(year)} for year in sorted(df['Election Year'].dropna().unique())],
-                            id='average-donation-year-dropdown',
+                            options=dimensions.year_options,
+                            id='global-year-dropdown',
                             placeholder='Select Election Year',
                             value=2025,
                             style={'marginBottom': '10px'}
                         ),
-                        # Candidate Dropdown for Average Donation Table
+                        width=6
+                    ),
+                    dbc.Col(
                         dcc.Dropdown(
-                            options=[{'label': candidate, 'value': candidate} for candidate in sorted(df['Cand/Committee:'].unique())],
-                            id='average-donation-candidate-dropdown',
-                            placeholder='Select Candidate(s)',
+                            options=dimensions.candidate_options,
+                            id='global-candidate-dropdown',
                             multi=True,
-                            style={'marginBottom': '20px'}
-                        ),
-                        # Average Donation Table
-                        dash_table.DataTable(
-                            id='average-donation-table',
-                            columns = [
-                                {'name': 'Candidate', 'id': 'Cand/Committee:'},
-                                {'name': 'Average Donation Amount', 'id': 'Average Donation', 'type': 'numeric', 'format': {'specifier': '$,.2f'}},
-                                {'name': 'Number of Donations', 'id': 'Donation Count'},
-                                {'name': 'Top Donor', 'id': 'Top Donor'}
-                            ],
-                            page_size=10,
-                            sort_action='native',
-                            style_table={'overflowX': 'auto'},
-                            style_header={'backgroundColor': '#f1f1f1',
-                                          'fontWeight': 'bold',
-                                          'color': '#333333'},
-                            style_cell={'textAlign': 'center'},
-                            style_data_conditional=[
-                                {'if': {'row_index': 'odd'},
-                                 'backgroundColor': '#f9f9f9'}
-                            ]
-                        )
-                    ],
-                    width=6,
-                    style={'marginBottom': '20px', 'paddingLeft': '15px'}
-                ),
-                #Top Donors Table
-                dbc.Col(
-                    [
-                        html.H5("Top Donors by Total Contributions", style={'text-align': 'center', 'color': '#333333', 'marginBottom':'10px'}),
-                        # Election Year dropdown for Top Donors table
-                        dcc.Dropdown(
-                            options=[{'label': str(int(year)), 'value': int(year)} for year in sorted(df['Election Year'].dropna().unique())],
-                            id='donor-year-dropdown',
-                            placeholder='Select Election Year',
-                            value=2025,
+                            placeholder='Select Candidate(s)',
                             style={'marginBottom': '10px'}
                         ),
-                        # Candidate Dropdown for Top Donors table
-                        dcc.Dropdown(
-                            options=[{'label': candidate, 'value': candidate} for candidate in sorted(df['Cand/Committee:'].unique())],
-                            id='donor-candidate-dropdown',
-                            placeholder='Select Candidate',
-                            style={'marginBottom': '20px'}
+                        width=6
+                    ),
+                ],
+                style={'marginBottom': '20px'}
+            ),      
+            dbc.Row(
+                [
+                    dbc.Col(
+                        html.H4("Total Contributions & Expenditures",
+                                style={'text-align': 'center',
+                                       'marginTop': '40px', 
+                                       'marginBottom': '15px',
+                                       'color': '#1s73e8'}),
+                                width=12
+                    ),
+                    dbc.Col(
+                        dcc.Graph(id='cand-committee-graph', config={'displayModeBar': False}),
+                        width=12,
+                        style={
+                            'border': '1px solid #e0e0e0',
+                            'padding': '20px',
+                            'box-shadow': '2px 2px 8px rbga(0,0,0,0.1)',
+                            'backgroundColor': 'white'
+                        }
+                    ),
+                ],
+                style={'marginBottom': '30px'}
+            ),
+            # Date range shown on both time series graphs
+            dbc.Row(
+                [
+                    dbc.Col(
+                        dcc.RangeSlider(
+                            id='timeseries-date-slider',
+                            min=dimensions.date_range[0],
+                            max=dimensions.date_range[1],
+                            step=1,
+                            value=dimensions.date_range,
+                            marks=dimensions.date_marks,
+                            allowCross=False
                         ),
-                        # Top Donors Table
-                        dash_table.DataTable(
-                            id='top-donors-aggregated-table',
-                            columns=[
-                                {'name': 'Donor Name', 'id': 'Name:'},
-                                {'name': 'Total Amount Donated', 'id': 'Total Amount', 'type': 'numeric', 'format': {'specifier': '$,.2f'}},
-                                {'name': 'Number of Donations', 'id': 'Donation Count'},
-                                {'name': 'Top Candidate', 'id': 'Top Candidate'}
-                            ],
-                            page_size=10,
-                            sort_action='native',
-                            style_table={'overflowX': 'auto'},
-                            style_header={
-                                'backgroundColor': '#f1f1f1',
-                                'fontWeight': 'bold',
-                                'color': '#333333'
-                            },
-                            style_cell={'textAlign': 'center'},
-                            style_data_conditional=[
-                                {'if': {'row_index': 'odd'},
-                                 'backgroundColor': '#f9f9f9'}
-                            ]
-                        )
-                    ],
-                    width = 6,
-                    style={'marginBottom': '20px'}
-                ),
-                # Right: Average Donation Table
+                        width=12
+                    ),
+                ],
+                style={'marginTop': '20px'}
+            ),
+            dbc.Row(
+                [
+                    dbc.Col(
+                        html.H4("Monetary Political Contributions to Candidates Over Time", style={'text-align': 'center',
+                                                                                'marginTop': '40px',
+                                                                                'marginBottom': '15px'}),
+                        width=12
+                    ),
+                    dbc.Col(
+                        dcc.Graph(id='timeseries-graph'),
+                        width=12,
+                        style={
+                            'border': '1px solid #e0e0e0',
+                            'padding': '20px',
+                            'box-shadow': '2px 2px 8px rbga(0,0,0,0.1)',
+                            'backgroundColor': 'white'
+                        }
+                    ),
+                ],
+                style={'marginBottom': '30px'}
+            ),
+            # Expenditure Time Series Graph
+            dbc.Row(
+                [
+                    dbc.Col(
+                        html.H4("Political Expenditures Over Time",
+                                style={'text-align': 'center', 'marginTop': '20px', 'marginBottom': '20px'}),
+                                width=12
+                    ),
+                    dbc.Col(
+                        dcc.Graph(id='expenditure-timeseries-graph'),
+                        width=12,
+                        style={
+                            'border': '1px solid #e0e0e0',
+                            'padding': '20px',
+                            'box-shadow': '2px 2px 8px rbga(0,0,0,0.1)',
+                            'backgroundColor': 'white'
+                        }
+                    ),
+                ],
+                style={'marginBottom': '30px'}
+            
+            ),
+    #         # Top Donors Table
+            dbc.Row(
+                [
+                    dbc.Col(
+                        html.H4("Donors & Contributions",
+                                style={'text-align': 'center', 'marginTop': '20px', 'marginBottom': '20px'}),
+                                width=12
+                    )
+                ]
+            ),
+            # Row with both tables and drop downs aligned and styled
+            dbc.Row(
+                [
+                    dbc.Col(
+                        [
+                            html.H5("Average Donation to Candidates", style={'text-align': 'center', 'color': '#333333', 'marginBottom': '10px'}),
+                            # Election Year Dropdown for Average Donation Table
+                            dcc.Dropdown(
+                                options=dimensions.year_options,
+                                id='average-donation-year-dropdown',
+                                placeholder='Select Election Year',
+                                value=2025,
+                                style={'marginBottom': '10px'}
+                            ),
+                            # Candidate Dropdown for Average Donation Table
+                            dcc.Dropdown(
+                                options=dimensions.candidate_options,
+                                id='average-donation-candidate-dropdown',
+                                placeholder='Select Candidate(s)',
+                                multi=True,
+                                style={'marginBottom': '20px'}
+                            ),
+                            # Average Donation Table
+                            dash_table.DataTable(
+                                id='average-donation-table',
+                                columns = [
+                                    {'name': 'Candidate', 'id': 'Cand/Committee:'},
+                                    {'name': 'Average Donation Amount', 'id': 'Average Donation', 'type': 'numeric', 'format': {'specifier': '$,.2f'}},
+                                    {'name': 'Number of Donations', 'id': 'Donation Count'},
+                                    {'name': 'Top Donor', 'id': 'Top Donor'}
+                                ],
+                                # paged, sorted and filtered server-side (see tables.py)
+                                page_current=0,
+                                page_size=10,
+                                page_action='custom',
+                                sort_action='custom',
+                                sort_mode='single',
+                                sort_by=[],
+                                filter_action='custom',
+                                filter_query='',
+                                style_table={'overflowX': 'auto'},
+                                style_header={'backgroundColor': '#f1f1f1',
+                                              'fontWeight': 'bold',
+                                              'color': '#333333'},
+                                style_cell={'textAlign': 'center'},
+                                style_data_conditional=[
+                                    {'if': {'row_index': 'odd'},
+                                     'backgroundColor': '#f9f9f9'}
+                                ]
+                            )
+                        ],
+                        width=6,
+                        style={'marginBottom': '20px', 'paddingLeft': '15px'}
+                    ),
+                    #Top Donors Table
+                    dbc.Col(
+                        [
+                            html.H5("Top Donors by Total Contributions", style={'text-align': 'center', 'color': '#333333', 'marginBottom':'10px'}),
+                            # Election Year dropdown for Top Donors table
+                            dcc.Dropdown(
+                                options=dimensions.year_options,
+                                id='donor-year-dropdown',
+                                placeholder='Select Election Year',
+                                value=2025,
+                                style={'marginBottom': '10px'}
+                            ),
+                            # Candidate Dropdown for Top Donors table
+                            dcc.Dropdown(
+                                options=dimensions.candidate_options,
+                                id='donor-candidate-dropdown',
+                                placeholder='Select Candidate',
+                                style={'marginBottom': '20px'}
+                            ),
+                            # Top Donors Table
+                            dash_table.DataTable(
+                                id='top-donors-aggregated-table',
+                                columns=[
+                                    {'name': 'Donor Name', 'id': 'Name:'},
+                                    {'name': 'Zip Code', 'id': 'ZipCode'},
+                                    {'name': 'Total Amount Donated', 'id': 'Total Amount', 'type': 'numeric', 'format': {'specifier': '$,.2f'}},
+                                    {'name': 'Number of Donations', 'id': 'Donation Count'},
+                                    {'name': 'Top Candidate', 'id': 'Top Candidate'}
+                                ],
+                                # paged, sorted and filtered server-side (see tables.py)
+                                page_current=0,
+                                page_size=10,
+                                page_action='custom',
+                                sort_action='custom',
+                                sort_mode='single',
+                                sort_by=[],
+                                filter_action='custom',
+                                filter_query='',
+                                style_table={'overflowX': 'auto'},
+                                style_header={
+                                    'backgroundColor': '#f1f1f1',
+                                    'fontWeight': 'bold',
+                                    'color': '#333333'
+                                },
+                                style_cell={'textAlign': 'center'},
+                                style_data_conditional=[
+                                    {'if': {'row_index': 'odd'},
+                                     'backgroundColor': '#f9f9f9'}
+                                ]
+                            )
+                        ],
+                        width = 6,
+                        style={'marginBottom': '20px'}
+                    ),
+                    # Right: Average Donation Table
                 
-            ],
-            style={'marginBottom': '20px'}
-        ),
-        # Download the Data
-        dbc.Row(
-            [
-                dbc.Col(
-                    [
-                        html.H4("Download the Data", style={'text-align': 'center', 'color': '#333333', 'marginTop': '30px'}),
-                        html.P(
-                            """
-                            The complete campaign finance dataset used in this application is available from the City of San Antonio's campaign finance website and Data210's GitHub repository.
-                            """,
-                            style={'text-align': 'justify', 'color': '#333333', 'marginTop': '15px'}
-                        ),
-                        html.Ul(
-                            [
-                                html.Li(html.A("City of San Antonio Campaign Finance Page", href="https://webapp1.sanantonio.gov/campfinsearch/search.aspx",
-                                               target="_blank", style={'color': '#1a73e8'})),
-                                html.Li(html.A("Data210 GitHub Repository for Full Dataset", href="https://github.com/data-210/SATX-Campaign-Finance/tree/63e582011c14becc00d8e3ad4bfe0edbf714999d/data",
-                                               target="_blank", style={'color': '#1a73e8'}))
+                ],
+                style={'marginBottom': '20px'}
+            ),
+            # Donor Lookup
+            dbc.Row(
+                [
+                    dbc.Col(
+                        [
+                            html.H5("Donor Lookup", style={'text-align': 'center', 'color': '#333333', 'marginBottom':'10px'}),
+                            # Donor search (options are filled in as the user types)
+                            dcc.Dropdown(
+                                id='donor-lookup-dropdown',
+                                placeholder='Search for a donor by name',
+                                style={'marginBottom': '10px'}
+                            ),
+                            # Candidate Dropdown for Donor Lookup
+                            dcc.Dropdown(
+                                options=dimensions.candidate_options,
+                                id='donor-lookup-candidate-dropdown',
+                                placeholder='Select Candidate(s)',
+                                multi=True,
+                                style={'marginBottom': '20px'}
+                            ),
+                            # Every donation by the selected donor
+                            dash_table.DataTable(
+                                id='donor-lookup-table',
+                                columns=[
+                                    {'name': 'Date', 'id': 'TransDate:'},
+                                    {'name': 'Candidate', 'id': 'Cand/Committee:'},
+                                    {'name': 'Type', 'id': 'strVal'},
+                                    {'name': 'Amount', 'id': 'Amount:', 'type': 'numeric', 'format': {'specifier': '$,.2f'}},
+                                    {'name': 'Report', 'id': 'Report Type:'}
+                                ],
+                                page_size=10,
+                                sort_action='native',
+                                style_table={'overflowX': 'auto'},
+                                style_header={
+                                    'backgroundColor': '#f1f1f1',
+                                    'fontWeight': 'bold',
+                                    'color': '#333333'
+                                },
+                                style_cell={'textAlign': 'center'},
+                                style_data_conditional=[
+                                    {'if': {'row_index': 'odd'},
+                                     'backgroundColor': '#f9f9f9'}
+                                ]
+                            )
+                        ],
+                        width=12,
+                        style={'marginBottom': '20px'}
+                    )
+                ],
+                style={'marginBottom': '20px'}
+            ),
+            # Download the Data
+            dbc.Row(
+                [
+                    dbc.Col(
+                        [
+                            html.H4("Download the Data", style={'text-align': 'center', 'color': '#333333', 'marginTop': '30px'}),
+                            html.P(
+                                """
+                                The complete campaign finance dataset used in this application is available from the City of San Antonio's campaign finance website and Data210's GitHub repository.
+                                """,
+                                style={'text-align': 'justify', 'color': '#333333', 'marginTop': '15px'}
+                            ),
+                            html.Ul(
+                                [
+                                    html.Li(html.A("City of San Antonio Campaign Finance Page", href="https://webapp1.sanantonio.gov/campfinsearch/search.aspx",
+                                                   target="_blank", style={'color': '#1a73e8'})),
+                                    html.Li(html.A("Data210 GitHub Repository for Full Dataset", href="https://github.com/data-210/SATX-Campaign-Finance/tree/63e582011c14becc00d8e3ad4bfe0edbf714999d/data",
+                                                   target="_blank", style={'color': '#1a73e8'}))
                                                
-                            ],
-                            style={'marginTop': '10px'}
-                        )
-                    ],
-                    width=12,
-                    style={'padding': '20px', 'backgroundColor': '#f9f9f9', 'borderTop': '1px solid #e0e0e0'}
-                )
-            ],
-            style={'marginTop': '30px'}
-        ),
-        dbc.Row(
-            [
-                dbc.Col(
-                    [
-                        html.H4("Methodology", style={'text-align': 'center', 'color': '#333333', 'marginTop': '20px'}),
-                        html.P(
-                            """
-                            This City of San Antonio Campaign Finance dashboard was created to provide insights into political donations and expenditures of candidates for San Antonio's various political offices.
-                            Users can explore previous election years' campaign finance figures as well as upcoming elections.
-                            The graphs and tables above provide detail about each candidate's expenditures and donations, as well as top donors to each candidate and the average donation amount each candidate receives.
-                            This effort was influenced by a curiosity about how candidates for San Antonio City Council and Mayor raise money, spend money, how much money is involved in these campaigns, and who is donating money to candidates.
-                            As Article VII of the City Charter, which covers campaign finance, says:  "It is essential in a democratic system that the public has confidence in the integrity, independence, and impartiality of those who are elected to act on their behalf in government. There is a public perception that a relationship exists between substantial contributions and access to elected officials. To diminish the perceived or actual connection between contributions and influence, the city adopts this Campaign Finance Code to promote public confidence and, it is hoped, a greater degree of citizen participation in the electoral process."
-                            We hope that this dashboard encourages San Antonio voters to learn more about how candidates who wish to represent them in city government are funded.
-                            """,
-                            style={'text-align': 'justify', 'color': '#333333', 'marginTop': '15px'}
-                        ),
-                        html.P(
-                            """
-                            The first graph of the dashboard, Total Contributions and Expenditures, shows the sum total of all donations to each candidate and the sum total of all expenditures made by the same candidate.
-                            Users can use the Election Year dropdown to view data for the previous election years or for the next City election year (2025). 
-                            The Election Year dropdown values come from the campaign finance reports submitted by the candidates. When candidates submit a campaign finance report detailing a donation or an expenditure, the election year for that particular report must be specified.
-                            The candidate dropdown values come from the Cand/Committee: column of the campaign finance data. Users have the ability to select multiple candidates and examine the contributions and expenditures for each.
-                            For example, if you wanted to see donations and expenditures for Councilwoman Kaur and former Councilman Bravo (District 1) in the 2023 City Council election, you would select '2023' from the Election Year dropdown and select Sukh Kaur and Mario Bravo in the candidate dropdown.
-                            """,
-                            style={'text-align': 'justify', 'color': '#333333', 'marginTop': '15px'}
-                        ),
-                        html.P(
-                            """
-                            The next two graphs show contributions and expenditures over time for each candidate in a given election year. 
-                            These graphs show how much money candidates have received over the course of a calendar year for a given election. It also shows how much money candidates have spent over time for a given election year.
-                            The Election Year and Candidate dropdown menus work the same way as the Total Contributions and Expenditures dropdowns.
-                            Users can choose an election year and either one or several candidates to view how much money their campaigns received over time and how much money the candidates spent as the year progresses.
-                            Sticking with the Councilwoman Kaur and former Councilman Bravo example, the user can see the Bravo started receiving contributions for Election Year 2023 much sooner than Councilwoman Kaur did and that he raised more money overall.
-                            Bravo also spent more money during the campaign that Kaur, but ended up losing the election.
-                            """,
-                            style={'text-align': 'justify', 'color': '#333333', 'marginTop': '15px'}
-                        ),
-                        html.P(
-                            """
-                            The final two tables of the dashboard show Top Donors by Total Contributions and Average Donations to Candidates.
-                            The first table, Top Donors by Total Contributions, allows users to see who the top donor is to each candidate. 
-                            Election Year 2025 is the default option for this table, but users can choose any election year and candidate they want.
-                            The table is automatically sorted by the "Total Amount Donated" column (largest donation to smallest), but the user has the option to sort by the other columns, as well.
-                            Users can also see how many times a donor has contributed to a candidate. For example, for Election Year 2025, Councilwoman Kaur's top donor has made 5 contributions totaling $2,500.
-                            """,
-                            style={'text-align': 'justify', 'color': '#333333', 'marginTop': '15px'}
-                        ),
-                        html.P(
-                            """
-                            The second table shows Average Donations to Candidates. The final column of the table also shows who that candidate's top donor is.
-                            Like the table above, users can choose different election years but can also select multiple candidates for comparison.
-                            Let's look at the race between Sukh Kaur and Mario Bravo again. By selecting Election Year 2023 and those candidates, the user can see that Bravo's average donation was $320.00 and Kaur's was $282.02.
-                            Bravo also received a lower number of donations compared to Kaur. 
-                            """,
-                            style={'text-align': 'justify', 'color': '#333333', 'marginTop': '15px'}
-                        ),
-                        html.P(
-                            """
-                            This dashboard will continue to be updated on a monthly basis. If there any questions, feature requests, comments, or problems with the data, we'd love to hear from you!
-                            You can reach out at jack@data210.com.
-                            """
-                        )
-                    ]
-                )
-            ]
-        )
-    ]
-)
-
-
-# Callback for updating candidate-based bar graph
-@app.callback(
-    Output('cand-committee-graph', 'figure'),
-    [Input('global-year-dropdown', 'value'), Input('global-candidate-dropdown', 'value')]
-)
+                                ],
+                                style={'marginTop': '10px'}
+                            )
+                        ],
+                        width=12,
+                        style={'padding': '20px', 'backgroundColor': '#f9f9f9', 'borderTop': '1px solid #e0e0e0'}
+                    )
+                ],
+                style={'marginTop': '30px'}
+            ),
+            dbc.Row(
+                [
+                    dbc.Col(
+                        [
+                            html.H4("Methodology", style={'text-align': 'center', 'color': '#333333', 'marginTop': '20px'}),
+                            html.P(
+                                """
+                                This City of San Antonio Campaign Finance dashboard was created to provide insights into political donations and expenditures of candidates for San Antonio's various political offices.
+                                Users can explore previous election years' campaign finance figures as well as upcoming elections.
+                                The graphs and tables above provide detail about each candidate's expenditures and donations, as well as top donors to each candidate and the average donation amount each candidate receives.
+                                This effort was influenced by a curiosity about how candidates for San Antonio City Council and Mayor raise money, spend money, how much money is involved in these campaigns, and who is donating money to candidates.
+                                As Article VII of the City Charter, which covers campaign finance, says:  "It is essential in a democratic system that the public has confidence in the integrity, independence, and impartiality of those who are elected to act on their behalf in government. There is a public perception that a relationship exists between substantial contributions and access to elected officials. To diminish the perceived or actual connection between contributions and influence, the city adopts this Campaign Finance Code to promote public confidence and, it is hoped, a greater degree of citizen participation in the electoral process."
+                                We hope that this dashboard encourages San Antonio voters to learn more about how candidates who wish to represent them in city government are funded.
+                                """,
+                                style={'text-align': 'justify', 'color': '#333333', 'marginTop': '15px'}
+                            ),
+                            html.P(
+                                """
+                                The first graph of the dashboard, Total Contributions and Expenditures, shows the sum total of all donations to each candidate and the sum total of all expenditures made by the same candidate.
+                                Users can use the Election Year dropdown to view data for the previous election years or for the next City election year (2025). 
+                                The Election Year dropdown values come from the campaign finance reports submitted by the candidates. When candidates submit a campaign finance report detailing a donation or an expenditure, the election year for that particular report must be specified.
+                                The candidate dropdown values come from the Cand/Committee: column of the campaign finance data. Users have the ability to select multiple candidates and examine the contributions and expenditures for each.
+                                For example, if you wanted to see donations and expenditures for Councilwoman Kaur and former Councilman Bravo (District 1) in the 2023 City Council election, you would select '2023' from the Election Year dropdown and select Sukh Kaur and Mario Bravo in the candidate dropdown.
+                                """,
+                                style={'text-align': 'justify', 'color': '#333333', 'marginTop': '15px'}
+                            ),
+                            html.P(
+                                """
+                                The next two graphs show contributions and expenditures over time for each candidate in a given election year. 
+                                These graphs show how much money candidates have received over the course of a calendar year for a given election. It also shows how much money candidates have spent over time for a given election year.
+                                The Election Year and Candidate dropdown menus work the same way as the Total Contributions and Expenditures dropdowns.
+                                Users can choose an election year and either one or several candidates to view how much money their campaigns received over time and how much money the candidates spent as the year progresses.
+                                Sticking with the Councilwoman Kaur and former Councilman Bravo example, the user can see the Bravo started receiving contributions for Election Year 2023 much sooner than Councilwoman Kaur did and that he raised more money overall.
+                                Bravo also spent more money during the campaign that Kaur, but ended up losing the election.
+                                """,
+                                style={'text-align': 'justify', 'color': '#333333', 'marginTop': '15px'}
+                            ),
+                            html.P(
+                                """
+                                The final two tables of the dashboard show Top Donors by Total Contributions and Average Donations to Candidates.
+                                The first table, Top Donors by Total Contributions, allows users to see who the top donor is to each candidate. 
+                                Election Year 2025 is the default option for this table, but users can choose any election year and candidate they want.
+                                The table is automatically sorted by the "Total Amount Donated" column (largest donation to smallest), but the user has the option to sort by the other columns, as well.
+                                Users can also see how many times a donor has contributed to a candidate. For example, for Election Year 2025, Councilwoman Kaur's top donor has made 5 contributions totaling $2,500.
+                                """,
+                                style={'text-align': 'justify', 'color': '#333333', 'marginTop': '15px'}
+                            ),
+                            html.P(
+                                """
+                                The second table shows Average Donations to Candidates. The final column of the table also shows who that candidate's top donor is.
+                                Like the table above, users can choose different election years but can also select multiple candidates for comparison.
+                                Let's look at the race between Sukh Kaur and Mario Bravo again. By selecting Election Year 2023 and those candidates, the user can see that Bravo's average donation was $320.00 and Kaur's was $282.02.
+                                Bravo also received a lower number of donations compared to Kaur. 
+                                """,
+                                style={'text-align': 'justify', 'color': '#333333', 'marginTop': '15px'}
+                            ),
+                            html.P(
+                                """
+                                This dashboard will continue to be updated on a monthly basis. If there any questions, feature requests, comments, or problems with the data, we'd love to hear from you!
+                                You can reach out at jack@data210.com.
+                                """
+                            )
+                        ]
+                    )
+                ]
+            )
+        ]
+    )
+
+
+
+# Dash validates callbacks against a layout function by calling it once when
+# it is set; validating against an empty layout instead keeps the data load
+# off the import path
+app.validation_layout = build_layout(Dimensions())
+app.layout = serve_layout
+
+GRAPH_OUTPUTS = [Output('cand-committee-graph', 'figure'),
+                 Output('timeseries-graph', 'figure'),
+                 Output('expenditure-timeseries-graph', 'figure')]
+GRAPH_INPUTS = [Input('global-year-dropdown', 'value'), Input('global-candidate-dropdown', 'value'),
+                Input('timeseries-date-slider', 'value')]
+
+
+# Callback for the three graphs: one request per interaction, each figure
+# memoized on its own inputs so moving the date range slider reuses the bar
+# graph
+@metrics.instrument
+def update_graphs(selected_year, selected_candidates, date_range):
+    return (update_graph(selected_year, selected_candidates),
+            update_timeseries(selected_year, selected_candidates, date_range),
+            updated_expenditures_timeseries(selected_year, selected_candidates, date_range))
+
+
+if CLIENTSIDE_GRAPHS:
+    app.clientside_callback(ClientsideFunction(namespace='graphs', function_name='update_graphs'),
+                            GRAPH_OUTPUTS, GRAPH_INPUTS + [Input('graph-data', 'data')])
+else:
+    app.callback(GRAPH_OUTPUTS, GRAPH_INPUTS)(update_graphs)
+
+
+# Candidate-based bar graph
+@cached
 def update_graph(selected_year, selected_candidates):
-    # Filter for selected year if specified
-    filtered_df = df[df['Election Year'] == selected_year] if selected_year else df
-
-    # Filter by selected candidates
-    if selected_candidates:
-        filtered_df = filtered_df[filtered_df['Cand/Committee:'].isin(selected_candidates)]
+    snapshot = dataset.current
 
-    # Seperate contributions and expenditures
-    contributions_df = filtered_df[filtered_df['Contact Type:'] == 'Contributor']
-    expenditures_df = filtered_df[filtered_df['Contact Type:'] == 'Expenditure']
+    # Daily contributions and expenditures for the selected year and candidates
+    contributions_df = snapshot.query.daily(selected_year, selected_candidates, 'Contributor')
+    expenditures_df = snapshot.query.daily(selected_year, selected_candidates, 'Expenditure')
 
     # Aggregate total contributions and expenditures for each candidate
-    contributions_agg = contributions_df.groupby('Cand/Committee:')['Amount:'].sum().reset_index()
-    expenditures_agg = expenditures_df.groupby('Cand/Committee:')['Amount:'].sum().reset_index()
+    contributions_agg = contributions_df.groupby(CANDIDATE_ID)['sum'].sum().rename('Amount:').reset_index()
+    expenditures_agg = expenditures_df.groupby(CANDIDATE_ID)['sum'].sum().rename('Amount:').reset_index()
 
-    # Merge dfs on Cand/Committee:
-    combined_df = pd.merge(contributions_agg, expenditures_agg, on='Cand/Committee:', how='outer',
-                           suffixes=('_contributions', '_expenditures')).fillna(0)
+    # Merge dfs on the candidate, then name and order the candidates
+    combined_df = pd.merge(contributions_agg, expenditures_agg, on=CANDIDATE_ID, how='outer',
+                           suffixes=('_contributions', '_expenditures'))
+    combined_df = combined_df.fillna({'Amount:_contributions': 0, 'Amount:_expenditures': 0})
+    combined_df = snapshot.candidates.named(combined_df).sort_values(by='Cand/Committee:')
 
     # Graph
     fig = {
@@ -400,35 +646,28 @@ def update_graph(selected_year, selected_candidates):
     return fig
 
 
-# Callback for timeseries chart
-@app.callback(
-    Output('timeseries-graph', 'figure'),
-    [Input('global-year-dropdown', 'value'), Input('global-candidate-dropdown', 'value')]
-)
-def update_timeseries(selected_year, selected_candidates):
-    filtered_df = df[df['strVal'] == 'Monetary Political Contributions']
-    if selected_year:
-        filtered_df = filtered_df[filtered_df['Election Year'] == selected_year]
+# Start and end dates of the date range slider value (None when unset)
+def date_range_bounds(date_range):
+    if not date_range:
+        return None, None
+    return from_day(date_range[0]), from_day(date_range[1])
 
-    if selected_candidates:
-        filtered_df = filtered_df[filtered_df['Cand/Committee:'].isin(selected_candidates)]
 
-    # Aggregate data by Cand/Committee: and TransDate:
-    timeseries_df = filtered_df.groupby(['TransDate:', 'Cand/Committee:'])['Amount:'].sum().reset_index()
+# Timeseries chart
+@cached
+def update_timeseries(selected_year, selected_candidates, date_range):
+    snapshot = dataset.current
+    start, end = date_range_bounds(date_range)
 
-    # Sort by date to ensure cumsums are in order
-    timeseries_df = timeseries_df.sort_values(by=['Cand/Committee:', 'TransDate:'])
+    # Running totals per candidate, precomputed at load time
+    timeseries_df = snapshot.contributions.frame(selected_year, selected_candidates, start, end)
+    timeseries_df = snapshot.candidates.named(timeseries_df).rename(columns={'Cumulative': 'Cumulative Contributions'})
 
-    # Calculate cumsum for each candidate
-    timeseries_df['Cumulative Contributions'] = timeseries_df.groupby('Cand/Committee:')['Amount:'].cumsum()
+    # Order traces by candidate name
+    timeseries_df = timeseries_df.sort_values(by=['Cand/Committee:', 'TransDate:'])
 
     fig = {
-        'data': [{
-            'x': timeseries_df[timeseries_df['Cand/Committee:']==candidate]['TransDate:'],
-            'y': timeseries_df[timeseries_df['Cand/Committee:']==candidate]['Cumulative Contributions'],
-            'type': 'line',
-            'name': candidate
-        } for candidate in timeseries_df['Cand/Committee:'].unique()],
+        'data': cumulative_traces(timeseries_df, 'Cumulative Contributions'),
         'layout': {
             'title': '',
             'xaxis': {'title': 'Date'},
@@ -439,26 +678,17 @@ def update_timeseries(selected_year, selected_candidates):
     return fig
 
 
-# Callback for expenditure timeseries graph
-@app.callback(
-    Output('expenditure-timeseries-graph', 'figure'),
-    [Input('global-year-dropdown', 'value'), Input('global-candidate-dropdown', 'value')]
-)
-def updated_expenditures_timeseries(selected_year, selected_candidates):
-    filtered_df = df[df['Contact Type:'] == 'Expenditure']
-    if selected_year:
-        filtered_df = filtered_df[filtered_df['Election Year'] == selected_year]
-    if selected_candidates:
-        filtered_df = filtered_df[filtered_df['Cand/Committee:'].isin(selected_candidates)]
-    timeseries_df = filtered_df.groupby(['TransDate:', 'Cand/Committee:'])['Amount:'].sum().reset_index()
+# Expenditure timeseries graph
+@cached
+def updated_expenditures_timeseries(selected_year, selected_candidates, date_range):
+    snapshot = dataset.current
+    start, end = date_range_bounds(date_range)
+    timeseries_df = snapshot.expenditures.frame(selected_year, selected_candidates, start, end)
+    timeseries_df = snapshot.candidates.named(timeseries_df).rename(columns={'Cumulative': 'Cumulative Expenditures'})
     timeseries_df = timeseries_df.sort_values(by=['Cand/Committee:', 'TransDate:'])
-    timeseries_df['Cumulative Expenditures'] = timeseries_df.groupby('Cand/Committee:')['Amount:'].cumsum()
 
     fig = {
-        'data': [{
-            'x': timeseries_df[timeseries_df['Cand/Committee:']==candidate]['TransDate:'],
-            'y': timeseries_df[timeseries_df['Cand/Committee:'] == candidate]['Cumulative Expenditures'],
-            'type': 'line', 'name': candidate} for candidate in timeseries_df['Cand/Committee:'].unique()],
+        'data': cumulative_traces(timeseries_df, 'Cumulative Expenditures'),
         'layout': {'title': '',
                    'xaxis': {'title': 'Date'},
                    'yaxis': {'title:': 'Total Expenditures ($)'},
@@ -468,71 +698,131 @@ def updated_expenditures_timeseries(selected_year, selected_candidates):
     return fig
 
 
-# # Callback for Top Donors Table
-@app.callback(
-    Output('top-donors-aggregated-table', 'data'),
-    [Input('donor-year-dropdown', 'value'), Input('donor-candidate-dropdown', 'value')]
-)
-def update_top_donors_aggregated_table(selected_year, selected_candidate):
-    # Filter for contributors in selected year
-    contributors_df = df[(df['Contact Type:'] == 'Contributor') & (df['Election Year'] == selected_year)]
-    if selected_candidate:
-        contributors_df = contributors_df[contributors_df['Cand/Committee:'] == selected_candidate]
+# Full top donors table for a year/candidate, paged by the callback below
+@cached
+def top_donors_table(selected_year, selected_candidate):
+    snapshot = dataset.current
+
+    # Donor x candidate contribution totals in selected year
+    contributors_df = snapshot.query.donors(selected_year, [selected_candidate] if selected_candidate else None)
 
     # Check for data
     if contributors_df.empty:
-        return []
-
-    # Aggregate data by donor
-    top_donors = contributors_df.groupby('Name:').agg(
-        **{
-            'Total Amount': ('Amount:', 'sum'),
-            'Donation Count': ('Amount:', 'size')
-        }
-    ).reset_index()
-
-    # Identify top candidate by amount for each donor
-    top_candidate_df = contributors_df.groupby(['Name:', 'Cand/Committee:'])['Amount:'].sum().reset_index()
-    top_candidate_df = top_candidate_df.loc[top_candidate_df.groupby('Name:')['Amount:'].idxmax()]
-    top_donors = top_donors.merge(top_candidate_df[['Name:', 'Cand/Committee:']], on='Name:')
+        return EMPTY
+
+    # Totals and top candidate of each donor in one pass (ties go to the first
+    # name), then only the DONOR_TABLE_ROWS largest totals when set
+    top = grouped_top(contributors_df, DONOR_ID, CANDIDATE_ID, snapshot.candidates.name_ranks)
+    donor_ranks = snapshot.donors.name_ranks[top[DONOR_ID].to_numpy(dtype='int64')]
+    top = top.iloc[largest(top['sum'].to_numpy(), DONOR_TABLE_ROWS, donor_ranks)]
+    top_donors = pd.DataFrame({DONOR_ID: top[DONOR_ID], 'Total Amount': top['sum'],
+                               'Donation Count': top['size'], CANDIDATE_ID: top['top']})
+    top_donors = snapshot.candidates.named(top_donors).drop(columns=CANDIDATE_ID)
     top_donors.rename(columns={'Cand/Committee:': 'Top Candidate'}, inplace=True)
+    top_donors = snapshot.donors.named(top_donors).drop(columns=DONOR_ID)
 
-    # Sort by total amount and select top 10 donors
-    top_donors = top_donors.sort_values(by='Total Amount', ascending=False)#.head(10)
+    # Sort by total amount
+    top_donors = top_donors.sort_values(by='Total Amount', ascending=False)
 
-    return top_donors.to_dict('records')
+    return PagedTable(top_donors)
 
 
-# Callback for Average Donation Table
+# # Callback for Top Donors Table
 @app.callback(
-    Output('average-donation-table', 'data'),
-    [Input('average-donation-year-dropdown', 'value'), Input('average-donation-candidate-dropdown', 'value')]
+    [Output('top-donors-aggregated-table', 'data'),
+     Output('top-donors-aggregated-table', 'page_count'),
+     Output('top-donors-aggregated-table', 'page_current')],
+    [Input('donor-year-dropdown', 'value'), Input('donor-candidate-dropdown', 'value'),
+     Input('top-donors-aggregated-table', 'page_current'), Input('top-donors-aggregated-table', 'page_size'),
+     Input('top-donors-aggregated-table', 'sort_by'), Input('top-donors-aggregated-table', 'filter_query')]
 )
-def update_average_donation_table(selected_year, selected_candidate):
-    filtered_df = df[(df['Contact Type:'] == 'Contributor') & (df['Election Year'] == selected_year)]
+@metrics.instrument
+def update_top_donors_aggregated_table(selected_year, selected_candidate, page_current, page_size, sort_by, filter_query):
+    table = top_donors_table(selected_year, selected_candidate)
+    return table.page(page_current, page_size, sort_by, filter_query)
 
-    if selected_candidate:
-        filtered_df = filtered_df[filtered_df['Cand/Committee:'].isin(selected_candidate)]
-
-    if filtered_df.empty:
-        return []
 
-    avg_donation_df = filtered_df.groupby('Cand/Committee:').agg(
-        Average_Donation = ('Amount:', 'mean'),
-        Donation_Count = ('Amount:', 'size')
-    ).reset_index()
+# Full average donation table for a year/candidates, paged by the callback below
+@cached
+def average_donation_table(selected_year, selected_candidate):
+    snapshot = dataset.current
+    filtered_df = snapshot.query.donors(selected_year, selected_candidate)
 
-    top_donor_df = filtered_df.groupby(['Cand/Committee:', 'Name:'])['Amount:'].sum().reset_index()
-    top_donor_df = top_donor_df.loc[top_donor_df.groupby('Cand/Committee:')['Amount:'].idxmax()]
-    avg_donation_df = avg_donation_df.merge(top_donor_df[['Cand/Committee:', 'Name:']], on='Cand/Committee:')
-    avg_donation_df.rename(columns={'Average_Donation': 'Average Donation', 'Donation_Count': 'Donation Count', 'Name:': 'Top Donor'}, inplace=True)
+    if filtered_df.empty:
+        return EMPTY
+
+    # Totals and top donor of each candidate in one pass (ties go to the first
+    # name), then only the DONOR_TABLE_ROWS largest averages when set
+    top = grouped_top(filtered_df, CANDIDATE_ID, DONOR_ID, snapshot.donors.name_ranks)
+    average = top['sum'] / top['count']
+    candidate_ranks = snapshot.candidates.name_ranks[top[CANDIDATE_ID].to_numpy(dtype='int64')]
+    keep = largest(average.to_numpy(), DONOR_TABLE_ROWS, candidate_ranks)
+    top, average = top.iloc[keep], average.iloc[keep]
+    avg_donation_df = pd.DataFrame({CANDIDATE_ID: top[CANDIDATE_ID], 'Average Donation': average,
+                                    'Donation Count': top['size'], DONOR_ID: top['top']})
+    avg_donation_df = snapshot.donors.named(avg_donation_df).drop(columns=[DONOR_ID, 'ZipCode'])
+    avg_donation_df = snapshot.candidates.named(avg_donation_df).drop(columns=CANDIDATE_ID)
+    avg_donation_df.rename(columns={'Name:': 'Top Donor'}, inplace=True)
 
     # Sort by Average Donation
     avg_donation_df = avg_donation_df.sort_values(by='Average Donation', ascending=False)
 
-    return avg_donation_df.to_dict('records')
+    return PagedTable(avg_donation_df)
+
+
+# Callback for Average Donation Table
+@app.callback(
+    [Output('average-donation-table', 'data'),
+     Output('average-donation-table', 'page_count'),
+     Output('average-donation-table', 'page_current')],
+    [Input('average-donation-year-dropdown', 'value'), Input('average-donation-candidate-dropdown', 'value'),
+     Input('average-donation-table', 'page_current'), Input('average-donation-table', 'page_size'),
+     Input('average-donation-table', 'sort_by'), Input('average-donation-table', 'filter_query')]
+)
+@metrics.instrument
+def update_average_donation_table(selected_year, selected_candidate, page_current, page_size, sort_by, filter_query):
+    table = average_donation_table(selected_year, selected_candidate)
+    return table.page(page_current, page_size, sort_by, filter_query)
+
+
+# Donor search: donors whose name contains the typed text
+@app.callback(
+    Output('donor-lookup-dropdown', 'options'),
+    Input('donor-lookup-dropdown', 'search_value'),
+    State('donor-lookup-dropdown', 'value')
+)
+@metrics.instrument
+def update_donor_options(search_value, value):
+    if not search_value:
+        raise PreventUpdate
+    donors = dataset.current.donors
+    donor_ids = donors.search(search_value)
+    # keep the current selection among the options
+    if value in donors.dimension.index and value not in donor_ids:
+        donor_ids.append(value)
+    return [{'label': donors.label(donor_id), 'value': donor_id} for donor_id in donor_ids]
+
+
+# Callback for Donor Lookup Table
+@app.callback(
+    Output('donor-lookup-table', 'data'),
+    [Input('donor-lookup-dropdown', 'value'), Input('donor-lookup-candidate-dropdown', 'value')]
+)
+@metrics.instrument
+@cached
+def update_donor_lookup_table(donor_id, selected_candidates):
+    donations = dataset.current.donors.donations(donor_id, selected_candidates)
+    if donations.empty:
+        return []
+
+    donations = donations[['TransDate:', 'Cand/Committee:', 'strVal', 'Amount:', 'Report Type:']]
+    donations = donations.sort_values(by='TransDate:', ascending=False)
+    donations['TransDate:'] = donations['TransDate:'].dt.strftime('%Y-%m-%d')
+    return donations.to_dict('records')
 
 
 if __name__ == '__main__':
     logging.basicConfig(level=logging.DEBUG, format="%(levelname)s: %(message)s")
+    dataset.load()
+    dataset.start_watching()
     app.run_server(debug=True)
\ No newline at end of file
@@ -0,0 +1,105 @@
+// Clientside version of update_graphs in app.py (CLIENTSIDE_GRAPHS=1): the
+// bar graph and both cumulative graphs built in the browser from the payload
+// in the graph-data store (see clientside.py).
+(function() {
+    function byName(data) {
+        return function(a, b) {
+            const x = data.candidates[a], y = data.candidates[b];
+            return x < y ? -1 : (x > y ? 1 : 0);
+        };
+    }
+
+    function toDate(day) {
+        return new Date(day * 86400000).toISOString().slice(0, 10);
+    }
+
+    // Row filter for the selected year (all years when unset) and candidates
+    function selection(year, candidates) {
+        const selected = candidates && candidates.length ? new Set(candidates) : null;
+        return function(columns, i) {
+            return (!year || columns.year[i] === year) && (!selected || selected.has(columns.candidate[i]));
+        };
+    }
+
+    function barFigure(data, year, keep) {
+        const totals = data.totals, sums = {};
+        for (let i = 0; i < totals.candidate.length; i++) {
+            if (!keep(totals, i)) {
+                continue;
+            }
+            const sum = sums[totals.candidate[i]] || (sums[totals.candidate[i]] = [0, 0]);
+            sum[0] += totals.contributions[i];
+            sum[1] += totals.expenditures[i];
+        }
+        const ids = Object.keys(sums).sort(byName(data));
+        const names = ids.map(function(id) { return data.candidates[id]; });
+        return {
+            data: [
+                {x: names, y: ids.map(function(id) { return sums[id][0]; }), type: 'bar', name: 'Contributions'},
+                {x: names, y: ids.map(function(id) { return sums[id][1]; }), type: 'bar', name: 'Expenditures'}
+            ],
+            layout: {
+                title: 'Contributions & Expenditures by Candidate/Committee for ' + (year || 'All Years'),
+                barmode: 'group',
+                xaxis: {title: 'Candidate/Committee'},
+                yaxis: {title: 'Total Amount ($)'}
+            }
+        };
+    }
+
+    // Running totals per candidate; points outside the date range are
+    // dropped but still counted, as on the server
+    function cumulativeTraces(data, series, keep, dateRange) {
+        const rows = {};
+        for (let i = 0; i < series.candidate.length; i++) {
+            if (keep(series, i)) {
+                (rows[series.candidate[i]] = rows[series.candidate[i]] || []).push(i);
+            }
+        }
+        const traces = [];
+        Object.keys(rows).sort(byName(data)).forEach(function(id) {
+            const candidateRows = rows[id], x = [], y = [];
+            let total = 0;
+            for (let j = 0; j < candidateRows.length; j++) {
+                const day = series.day[candidateRows[j]];
+                total += series.amount[candidateRows[j]];
+                // the same day in another election year: one point for both
+                if (j + 1 < candidateRows.length && series.day[candidateRows[j + 1]] === day) {
+                    continue;
+                }
+                if (dateRange && (day < dateRange[0] || day > dateRange[1])) {
+                    continue;
+                }
+                x.push(toDate(day));
+                y.push(total);
+            }
+            if (x.length) {
+                traces.push({x: x, y: y, type: 'line', name: data.candidates[id]});
+            }
+        });
+        return traces;
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        graphs: {
+            update_graphs: function(year, candidates, dateRange, data) {
+                if (!data) {
+                    return [window.dash_clientside.no_update, window.dash_clientside.no_update,
+                            window.dash_clientside.no_update];
+                }
+                const keep = selection(year, candidates);
+                return [
+                    barFigure(data, year, keep),
+                    {
+                        data: cumulativeTraces(data, data.contributions, keep, dateRange),
+                        layout: {title: '', xaxis: {title: 'Date'}, yaxis: {title: 'Cumulative Contributions ($)'}, showlegend: true}
+                    },
+                    {
+                        data: cumulativeTraces(data, data.expenditures, keep, dateRange),
+                        layout: {title: '', xaxis: {title: 'Date'}, yaxis: {'title:': 'Total Expenditures ($)'}, showlegend: true}
+                    }
+                ];
+            }
+        }
+    });
+})();
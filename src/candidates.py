@@ -0,0 +1,83 @@
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+# Integer code of each row's candidate/committee
+CANDIDATE_ID = 'Candidate Id'
+
+# Spellings of a candidate's name seen in the city exports -> the name shown
+# (previously fixed by hand in utils/syntax_date_updates.ipynb)
+ALIASES = {
+    'Manny Pelaez Pelaez': 'Manny Pelaez',
+    'Manuel Pelaez': 'Manny Pelaez',
+    'CLAYTON PERRY': 'Clayton Perry',
+}
+
+
+def empty_dimension():
+    return pd.DataFrame({
+        'Alias': pd.Series(dtype=object),
+        CANDIDATE_ID: pd.Series(dtype='int32'),
+        'Cand/Committee:': pd.Series(dtype=object),
+    })
+
+
+# Canonicalize the candidate names of a frame of transactions and add their
+# integer codes. The dimension has one row per spelling (alias -> id and
+# canonical name); spellings not in it yet are resolved through ALIASES, and
+# new candidates are numbered after the existing ones so codes stay stable
+# across ingests. Returns the frame and the extended dimension.
+def assign_candidate_ids(df, dimension=None, aliases=ALIASES):
+    if dimension is None:
+        dimension = empty_dimension()
+    new = pd.Series(df['Cand/Committee:'].dropna().unique(), dtype=object)
+    new = new[~new.isin(dimension['Alias'])]
+    if len(new):
+        canonical = new.map(lambda name: aliases.get(name, name))
+        ids = dict(zip(dimension['Cand/Committee:'], dimension[CANDIDATE_ID]))
+        for name in canonical:
+            if name not in ids:
+                ids[name] = len(ids)
+        dimension = pd.concat([dimension, pd.DataFrame({
+            'Alias': new.to_numpy(),
+            CANDIDATE_ID: canonical.map(ids).to_numpy(dtype='int32'),
+            'Cand/Committee:': canonical.to_numpy(),
+        })], ignore_index=True)
+
+    by_alias = dimension.set_index('Alias')
+    df = df.copy()
+    raw = df['Cand/Committee:'].astype(object)
+    df[CANDIDATE_ID] = raw.map(by_alias[CANDIDATE_ID]).astype('Int32')
+    df['Cand/Committee:'] = raw.map(by_alias['Cand/Committee:']).astype('category')
+    if 'FilerName' in df.columns:
+        df['FilerName'] = df['FilerName'].replace(aliases)
+    return df, dimension
+
+
+# Rank of each id (the index of `names`) when the names are sorted, as an
+# array indexed by id, so ties can be broken in name order the way a groupby
+# on the names would. Ids without a name rank last.
+def name_ranks(names):
+    ranks = np.full(int(names.index.max()) + 1 if len(names) else 0, len(names), dtype='int64')
+    ordered = names.sort_values(kind='stable', na_position='last').index.to_numpy(dtype='int64')
+    ranks[ordered] = np.arange(len(ordered))
+    return ranks
+
+
+class Candidates:
+    """Candidate/committee names by integer code, for dropdowns and display."""
+
+    def __init__(self, dimension):
+        self.dimension = dimension
+        self.names = dimension.drop_duplicates(CANDIDATE_ID).set_index(CANDIDATE_ID)['Cand/Committee:'].sort_index()
+        self.options = [{'label': name, 'value': int(candidate_id)}
+                        for candidate_id, name in self.names.sort_values().items()]
+
+    @cached_property
+    def name_ranks(self):
+        return name_ranks(self.names)
+
+    # Add the candidate name for the code column of a frame
+    def named(self, frame):
+        return frame.assign(**{'Cand/Committee:': frame[CANDIDATE_ID].map(self.names)})
@@ -0,0 +1,80 @@
+import json
+import logging
+import os
+
+import pandas as pd
+
+from candidates import CANDIDATE_ID
+
+# Largest payload, in bytes of JSON, shipped with the layout. Histories that
+# do not fit at daily resolution are sent as weekly, monthly, quarterly or
+# yearly buckets (each at its last transaction date), the finest that fits.
+MAX_BYTES = int(os.environ.get('CLIENTSIDE_MAX_BYTES', 300000))
+RESOLUTIONS = [None, 'W', 'M', 'Q', 'Y']
+
+
+def _years(values):
+    return [None if pd.isna(year) else int(year) for year in values]
+
+
+# Contribution and expenditure totals per (election year, candidate), as
+# drawn by the bar graph
+def _totals(daily):
+    daily = daily[daily['Contact Type:'].isin(['Contributor', 'Expenditure'])]
+    totals = daily.groupby(['Election Year', CANDIDATE_ID, 'Contact Type:'], dropna=False, observed=True)['sum'].sum()
+    totals = totals.unstack('Contact Type:').reindex(columns=['Contributor', 'Expenditure']).fillna(0).reset_index()
+    totals = totals[totals[CANDIDATE_ID].notna()]
+    return {
+        'year': _years(totals['Election Year']),
+        'candidate': totals[CANDIDATE_ID].astype(int).tolist(),
+        'contributions': totals['Contributor'].round(2).tolist(),
+        'expenditures': totals['Expenditure'].round(2).tolist(),
+    }
+
+
+# Amounts per (candidate, day, election year), sorted by candidate and day
+def _daily_series(daily):
+    daily = daily[daily[CANDIDATE_ID].notna() & daily['TransDate:'].notna()]
+    return daily.groupby([CANDIDATE_ID, 'TransDate:', 'Election Year'], dropna=False)['sum'].sum().reset_index()
+
+
+# Daily amounts bucketed by `freq` (None keeps them daily), as plain lists
+def _series(frame, freq=None):
+    if freq:
+        bucket = frame['TransDate:'].dt.to_period(freq).rename('bucket')
+        frame = frame.groupby([CANDIDATE_ID, bucket, 'Election Year'], dropna=False).agg(
+            {'TransDate:': 'max', 'sum': 'sum'}).reset_index()
+    frame = frame.sort_values([CANDIDATE_ID, 'TransDate:'], kind='stable')
+    return {
+        'candidate': frame[CANDIDATE_ID].astype(int).tolist(),
+        'day': frame['TransDate:'].to_numpy().astype('datetime64[D]').astype('int64').tolist(),
+        'year': _years(frame['Election Year']),
+        'amount': frame['sum'].round(2).tolist(),
+    }
+
+
+def payload_size(payload):
+    return len(json.dumps(payload))
+
+
+# Everything the clientside graph callback (assets/graphs.js) needs, as
+# columns of plain lists: candidate names by id, bar graph totals and the
+# amounts behind both cumulative graphs, at the finest resolution whose
+# payload fits in `max_bytes`
+def graph_payload(snapshot, max_bytes=MAX_BYTES):
+    daily = snapshot.cube.daily
+    contributions = _daily_series(daily[daily['strVal'] == 'Monetary Political Contributions'])
+    expenditures = _daily_series(daily[daily['Contact Type:'] == 'Expenditure'])
+    payload = {
+        'candidates': {str(candidate_id): name for candidate_id, name in snapshot.candidates.names.items()},
+        'totals': _totals(daily),
+    }
+    for freq in RESOLUTIONS:
+        payload['contributions'] = _series(contributions, freq)
+        payload['expenditures'] = _series(expenditures, freq)
+        if payload_size(payload) <= max_bytes:
+            break
+    else:
+        logging.warning("Clientside graph payload is %d bytes at yearly resolution, over the %d byte budget",
+                        payload_size(payload), max_bytes)
+    return payload
@@ -0,0 +1,282 @@
+from datetime import datetime, timezone
+from functools import cached_property
+from pathlib import Path
+import json
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+
+from candidates import Candidates
+from clientside import graph_payload
+from dates import parse_date_column
+from datastore import (CSV_FILE, DATA, SNAPSHOT_COLUMNS, STORE_FILE, load_aggregates, load_candidates, load_dataset,
+                       load_donors, load_query_backend, read_state, store_files)
+from donors import DonorIndex
+from memo import dataset_version
+from metrics import metrics
+from query import PandasBackend
+from series import CumulativeSeries, date_marks, to_day
+
+
+# Touched by /admin/reload: it is one of the data files, so the watcher in
+# every worker, not just the one that took the request, sees a new version
+RELOAD_FILE = 'campaign_finance.reload'
+
+
+# Files whose changes mean a new data drop: the CSV, the published store and
+# the reload trigger
+def data_files(data_dir=DATA):
+    files = [Path.joinpath(data_dir, CSV_FILE), Path.joinpath(data_dir, RELOAD_FILE)]
+    store_path = Path.joinpath(data_dir, STORE_FILE)
+    if store_path.is_dir():
+        files.extend(store_files(store_path))
+    else:
+        files.append(store_path)
+    return [path for path in files if path.exists()]
+
+
+def data_signature(data_dir=DATA):
+    return tuple(sorted((str(path), path.stat().st_mtime_ns, path.stat().st_size)
+                        for path in data_files(data_dir)))
+
+
+# When the data was downloaded from the city: DATA_DOWNLOADED (e.g.
+# '2025-01-20') if set, else the newest filing in it, from the store's ingest
+# state or the CSV's CreatedDt: column. None when neither is known.
+def data_downloaded(df, data_dir=DATA):
+    if os.environ.get('DATA_DOWNLOADED'):
+        return datetime.fromisoformat(os.environ['DATA_DOWNLOADED'])
+    store_path = Path.joinpath(data_dir, STORE_FILE)
+    state = read_state(store_path) if store_path.is_dir() else {}
+    if 'CreatedDt:' in state:
+        return datetime.fromisoformat(state['CreatedDt:'])
+    if 'CreatedDt:' in df.columns:
+        newest = parse_date_column(df['CreatedDt:']).max()
+        return newest.to_pydatetime() if pd.notna(newest) else None
+    return None
+
+
+# Layout inputs of the last snapshot loaded from a data directory (see
+# Dimensions); outside the store so writing it is not a new data drop
+DIMENSIONS_FILE = 'campaign_finance.layout.json'
+
+
+class Dimensions:
+    """What the page layout shows of a snapshot: header dates, dropdown options
+    and the date range, computed once per snapshot.
+
+    Saved next to the data, so a freshly started worker can serve the layout
+    from it while the dataset itself is still loading.
+    """
+
+    def __init__(self, signature=(), version='', data_last_download='', last_transaction_date='',
+                 last_modified=None, year_options=(), candidate_options=(), date_range=(0, 0)):
+        self.signature = tuple(tuple(entry) for entry in signature)
+        self.version = version
+        self.data_last_download = data_last_download
+        self.last_transaction_date = last_transaction_date
+        # Last-Modified of the layout built from these dimensions
+        self.last_modified = last_modified or datetime.fromtimestamp(0, timezone.utc)
+        # Dropdown options, shared by every dropdown in the layout
+        self.year_options = list(year_options)
+        self.candidate_options = list(candidate_options)
+        # Date range slider bounds (days since 1970-01-01) and labels
+        self.date_range = list(date_range)
+        self.date_marks = date_marks(*self.date_range) if self.date_range[1] else {}
+
+    # `downloaded` is the data's download date (see data_downloaded); the
+    # Last-Modified is the newest change to the data files, not counting
+    # reload requests
+    @classmethod
+    def of(cls, df, signature, version, candidates, downloaded=None):
+        newest = max((entry[1] for entry in signature if Path(entry[0]).name != RELOAD_FILE),
+                     default=time.time_ns())
+        return cls(
+            signature=signature,
+            version=version,
+            data_last_download=downloaded.strftime('%B %d, %Y') if downloaded else '',
+            last_transaction_date=df['TransDate:'].max().strftime('%m/%d/%Y'),
+            last_modified=datetime.fromtimestamp(newest / 1e9, timezone.utc),
+            year_options=[{'label': str(int(year)), 'value': int(year)}
+                          for year in sorted(df['Election Year'].dropna().unique())],
+            candidate_options=candidates.options,
+            date_range=[to_day(df['TransDate:'].min()), to_day(df['TransDate:'].max())],
+        )
+
+    def save(self, path):
+        state = dict(vars(self), last_modified=self.last_modified.isoformat())
+        del state['date_marks']
+        tmp = path.with_name(path.name + '.tmp')
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, path)
+
+    # Saved dimensions, or None when missing or unreadable
+    @classmethod
+    def read(cls, path):
+        try:
+            state = json.loads(path.read_text())
+            state['last_modified'] = datetime.fromisoformat(state['last_modified'])
+            return cls(**state)
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+
+class Snapshot:
+    """One fully loaded version of the dataset and everything derived from it."""
+
+    def __init__(self, df, cube, signature, donors, candidates, query=None, downloaded=None):
+        self.df = df
+        self.cube = cube
+        # What the callbacks query the rollups through (see query.py)
+        self.query = query or PandasBackend(cube)
+        self.donors = donors
+        self.candidates = candidates
+        self.signature = signature
+        self.version = dataset_version(df)
+
+        # Running totals behind the cumulative graphs
+        self.contributions = CumulativeSeries(cube.daily, str_val='Monetary Political Contributions')
+        self.expenditures = CumulativeSeries(cube.daily, contact_type='Expenditure')
+
+        # Header dates, dropdown options and date range for the layout
+        self.dimensions = Dimensions.of(df, signature, self.version, candidates, downloaded)
+
+    # Compact graph data for the clientside graphs, built on first use
+    @cached_property
+    def graph_payload(self):
+        return graph_payload(self)
+
+
+def load_snapshot(data_dir=DATA):
+    signature = data_signature(data_dir)
+    df = load_dataset(data_dir, memory_map=True, columns=SNAPSHOT_COLUMNS)
+    with metrics.phase('candidates'):
+        df, candidates = load_candidates(df, data_dir)
+    with metrics.phase('donor index'):
+        df, dimension = load_donors(df, data_dir)
+        donors = DonorIndex(df, dimension)
+    with metrics.phase('rollups'):
+        cube = load_aggregates(df, data_dir)
+    with metrics.phase('query backend'):
+        query = load_query_backend(cube, data_dir)
+    with metrics.phase('snapshot'):
+        return Snapshot(df, cube, signature, donors, Candidates(candidates), query, data_downloaded(df, data_dir))
+
+
+class DatasetHolder:
+    """Holds the current Snapshot and swaps in a new one when the data changes.
+
+    Nothing is read until the first use of `current` (or an explicit `load`),
+    so importing the app stays cheap; gunicorn.conf.py decides whether the
+    master or each worker does the load.
+
+    A new snapshot is loaded completely before the single reference swap, so a
+    request that read `current` keeps a consistent view for its whole run.
+    """
+
+    def __init__(self, data_dir=DATA):
+        self.data_dir = data_dir
+        self._current = None
+        self._saved_dimensions = None
+        self._on_swap = []
+        self._reload_lock = threading.Lock()
+        self._watcher_pid = None
+
+    # The loaded snapshot, loading it first if needed
+    @property
+    def current(self):
+        if self._current is None:
+            self.load()
+        return self._current
+
+    @current.setter
+    def current(self, snapshot):
+        self._current = snapshot
+
+    @property
+    def loaded(self):
+        return self._current is not None
+
+    # Load the data on disk unless a snapshot is already loaded
+    def load(self):
+        with self._reload_lock:
+            if self._current is None:
+                self._swap(load_snapshot(self.data_dir))
+        return self._current
+
+    # Load in a background thread; requests needing the data wait for it
+    def load_in_background(self):
+        threading.Thread(target=self.load, daemon=True).start()
+
+    # Layout inputs: the current snapshot's, or before it has loaded the ones
+    # saved by the last load of the same data
+    @property
+    def dimensions(self):
+        if self._current is None:
+            if self._saved_dimensions is None:
+                saved = Dimensions.read(Path.joinpath(self.data_dir, DIMENSIONS_FILE))
+                fresh = saved is not None and saved.signature == data_signature(self.data_dir)
+                self._saved_dimensions = saved if fresh else False
+            if self._saved_dimensions:
+                return self._saved_dimensions
+        return self.current.dimensions
+
+    # Register a function called with the new snapshot after each swap
+    def on_swap(self, func):
+        self._on_swap.append(func)
+        return func
+
+    def _swap(self, snapshot):
+        self._current = snapshot
+        try:
+            snapshot.dimensions.save(Path.joinpath(self.data_dir, DIMENSIONS_FILE))
+        except OSError:
+            logging.warning("Could not save the layout dimensions to %s", self.data_dir)
+        for func in self._on_swap:
+            func(snapshot)
+        logging.info("Loaded dataset version %s", snapshot.version)
+
+    # Load and swap in the data on disk if it differs from the current snapshot
+    def reload(self, force=False):
+        with self._reload_lock:
+            if not force and self._current is not None and data_signature(self.data_dir) == self._current.signature:
+                return False
+            snapshot = load_snapshot(self.data_dir)
+            # Files changed while loading (e.g. an ingest in progress): keep
+            # the current version and pick the finished data up next time
+            if self._current is not None and data_signature(self.data_dir) != snapshot.signature:
+                return False
+            self._swap(snapshot)
+            return True
+
+    # Reload in a background thread so the caller (a request) is not blocked
+    def reload_in_background(self, force=False):
+        threading.Thread(target=self.reload, kwargs={'force': force}, daemon=True).start()
+
+    # Reload in this process now and, through RELOAD_FILE, in every process
+    # watching the same data directory at its next poll
+    def request_reload(self):
+        Path.joinpath(self.data_dir, RELOAD_FILE).write_text(str(time.time_ns()))
+        self.reload_in_background(force=True)
+
+    # Poll the data directory every `interval` seconds. Threads do not survive
+    # fork, so each gunicorn worker starts its own watcher after forking.
+    def start_watching(self, interval=None):
+        if interval is None:
+            interval = float(os.environ.get('DATA_WATCH_INTERVAL', 60))
+        if interval <= 0 or self._watcher_pid == os.getpid():
+            return
+        self._watcher_pid = os.getpid()
+
+        def watch():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.reload()
+                except Exception:
+                    logging.exception("Dataset reload failed; keeping the current version")
+
+        threading.Thread(target=watch, daemon=True).start()
@@ -0,0 +1,322 @@
+from pathlib import Path
+import json
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from aggregates import AggregateCube
+from candidates import CANDIDATE_ID, assign_candidate_ids
+from donors import DONOR_ID, assign_donor_ids
+from dates import derive_calendar_columns, parse_date_column
+from exports import CHUNK_ROWS, read_export
+from metrics import metrics
+from query import QUERY_BACKEND, PandasBackend, SQLiteBackend, write_query_db
+
+REPO = Path(__file__).resolve().parents[1]
+DATA = Path.joinpath(REPO, 'data')
+
+# Cleaned CSV the dashboard has always read, and the columnar store built from
+# it. The store is a directory of Parquet part files so new filings can be
+# appended without rewriting history; entries starting with '_' are skipped
+# by Parquet readers and hold the rollups (also as an indexed SQLite file for
+# the sqlite query backend), candidate and donor dimensions and ingest state.
+# Parts being appended are written as '_pending-*' files and only renamed to
+# 'part-*' once the dimensions and rollups that cover them are written.
+CSV_FILE = 'campaign_finance.csv'
+STORE_FILE = 'campaign_finance.parquet'
+AGGREGATES_DIR = '_aggregates'
+CANDIDATES_FILE = '_candidates.parquet'
+DONORS_FILE = '_donors.parquet'
+QUERY_DB_FILE = '_query.sqlite'
+STATE_FILE = '_ingest_state.json'
+
+# Low-cardinality text columns stored as categoricals
+CATEGORICAL_COLUMNS = ['Cand/Committee:', 'Contact Type:', 'strVal', 'Name:']
+# Date columns parsed once at build time
+DATE_COLUMNS = ['TransDate:', 'CreatedDt:', 'Election Date:']
+# Columns of the transactions the dashboard keeps in memory when loading the
+# store: dates, years and ids for the layout and donor index, and what the
+# donor lookup shows. The rollups and dimensions are read from their own files.
+SNAPSHOT_COLUMNS = ['TransDate:', 'Election Year', CANDIDATE_ID, DONOR_ID, 'Cand/Committee:', 'strVal', 'Amount:',
+                    'Report Type:']
+# Columns identifying one transaction across exports. Report cover rows share
+# Id/ReportId, so the contact type and name are part of the key.
+KEY_COLUMNS = ['ReportId', 'Id', 'Contact Type:', 'Name:']
+
+
+# Parse dates with the export formats (columns already parsed are kept)
+def parse_dates(df):
+    df = df.copy()
+    for column in DATE_COLUMNS:
+        if column in df.columns:
+            df[column] = parse_date_column(df[column])
+    return df
+
+
+# Parse dates and cast columns to the types the store holds
+def prepare(df):
+    df = parse_dates(df)
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    if 'ZipCode' in df.columns:
+        df['ZipCode'] = normalize_zip_codes(df['ZipCode'])
+    return df
+
+
+# Zip codes as 5-digit strings. They arrive as ints, floats or strings
+# depending on the export, and the cleaned CSV has lost the leading zeros of
+# New England codes ('2138' for '02138'), so they are padded back.
+def normalize_zip_codes(values):
+    zips = values.astype('string').str.replace(r'\.0*$', '', regex=True).str.replace(r'\D', '', regex=True)
+    return zips.mask(zips == '').str.zfill(5)
+
+
+def _parts(path):
+    return sorted(Path(path).glob('part-*.parquet'))
+
+
+def _pending_parts(path):
+    return sorted(Path(path).glob('_pending-*.parquet'))
+
+
+# Parts of the store, followed by those a StoreWriter has appended but not
+# yet published
+def written_parts(path):
+    return _parts(path) + _pending_parts(path)
+
+
+# Files whose changes mean new data in the store: the published parts and the
+# dimensions and rollups, without unpublished parts or the ingest state
+def store_files(path):
+    files = [file for file in Path(path).rglob('*') if file.is_file()]
+    return [file for file in files if not file.name.startswith('_pending-') and file.name != STATE_FILE]
+
+
+# Arrow schema of the first part file, with every dictionary (categorical)
+# column on 32-bit indices so later parts with more categories still cast to it
+def _part_schema(schema):
+    return pa.schema([field.with_type(pa.dictionary(pa.int32(), field.type.value_type, field.type.ordered))
+                      if pa.types.is_dictionary(field.type) else field for field in schema],
+                     metadata=schema.metadata)
+
+
+class StoreWriter:
+    """Appends prepared frames to the store, one part file per frame.
+
+    Each frame gets candidate and donor ids and is folded into the rollups in
+    memory; the dimensions, rollups and query database are written once by
+    close(), so a chunked ingest rewrites them once however many chunks it
+    has. The parts are written under pending names that readers skip and
+    published by close() after the files covering them, so a reader never
+    sees new parts with stale rollups. Used as a context manager, an error
+    removes the parts written so far and leaves the store as it was.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.rows = 0
+        self._written = []
+        # left by a writer that was killed before publishing them
+        for part in _pending_parts(self.path):
+            part.unlink()
+        candidates_path = Path.joinpath(self.path, CANDIDATES_FILE)
+        self.candidates = pd.read_parquet(candidates_path) if candidates_path.exists() else None
+        donors_path = Path.joinpath(self.path, DONORS_FILE)
+        self.donors = pd.read_parquet(donors_path) if donors_path.exists() else None
+        aggregates_path = Path.joinpath(self.path, AGGREGATES_DIR)
+        self.cube = AggregateCube.load(aggregates_path) if aggregates_path.exists() else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is None:
+            self.close()
+        else:
+            for part in self._written:
+                part.unlink(missing_ok=True)
+
+    # Add a prepared frame as a new part file, cast to the schema of the
+    # existing parts
+    def append(self, df):
+        df, self.candidates = assign_candidate_ids(df, self.candidates)
+        df, self.donors = assign_donor_ids(df, self.donors)
+        self.path.mkdir(parents=True, exist_ok=True)
+        parts = written_parts(self.path)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        schema = pq.read_schema(parts[0]) if parts else _part_schema(table.schema)
+        part = Path.joinpath(self.path, f'_pending-{len(parts):05d}.parquet')
+        self._written.append(part)
+        pq.write_table(table.select(schema.names).cast(schema), part)
+        cube = AggregateCube.from_transactions(df)
+        self.cube = self.cube.merged(cube) if self.cube is not None else cube
+        self.rows += len(df)
+
+    # Write the dimensions, rollups and query database, then publish the new
+    # parts. Nothing is written when nothing was appended, so a no-op ingest
+    # is not a new data drop.
+    def close(self):
+        if not self.rows:
+            return
+        self.candidates.to_parquet(Path.joinpath(self.path, CANDIDATES_FILE), index=False)
+        self.donors.to_parquet(Path.joinpath(self.path, DONORS_FILE))
+        self.cube.save(Path.joinpath(self.path, AGGREGATES_DIR))
+        write_query_db(self.cube, Path.joinpath(self.path, QUERY_DB_FILE))
+        for part in self._written:
+            part.rename(part.with_name(part.name.replace('_pending-', 'part-')))
+
+
+# Remove the store so it can be written from scratch
+def clear_store(path):
+    path = Path(path)
+    if path.is_file():
+        path.unlink()
+    if path.exists():
+        shutil.rmtree(path)
+
+
+# Put the store built at `new_path` in place of the one at `path`. Each
+# rename is atomic; readers see the old store or the new one.
+def replace_store(new_path, path):
+    path = Path(path)
+    old_path = path.with_name(f'.{path.name}.old')
+    clear_store(old_path)
+    if path.exists():
+        path.rename(old_path)
+    Path(new_path).rename(path)
+    clear_store(old_path)
+
+
+# Replace the store with a prepared frame, its candidate and donor codes and
+# its rollups
+def write_store(df, path):
+    clear_store(path)
+    with StoreWriter(path) as writer:
+        writer.append(df)
+
+
+# Add a prepared frame to the store as a new part file and fold its
+# candidates, donors and rollups into the stored ones
+def append_store(df, path):
+    with StoreWriter(path) as writer:
+        writer.append(df)
+
+
+# Read only some columns of the store (e.g. the keys for de-duplication),
+# optionally pushing row filters down to the Parquet reader. Parts an open
+# StoreWriter has not published yet are included.
+def read_columns(path, columns, filters=None):
+    return pq.read_table(written_parts(path), columns=columns, filters=filters).to_pandas()
+
+
+def read_state(path):
+    state_path = Path.joinpath(Path(path), STATE_FILE)
+    if state_path.exists():
+        return json.loads(state_path.read_text())
+    return {}
+
+
+def write_state(path, state):
+    Path.joinpath(Path(path), STATE_FILE).write_text(json.dumps(state, indent=2))
+
+
+# High-water mark advanced past the filings in `df`. A field only moves
+# forward, and is left as it was when none of the rows has a value for it
+# (ingest keeps rows without a ReportId).
+def updated_state(state, df):
+    state = dict(state)
+    report_id = df['ReportId'].max(skipna=True)
+    if pd.notna(report_id):
+        state['ReportId'] = float(max(report_id, state.get('ReportId', report_id)))
+    created = df['CreatedDt:'].max(skipna=True)
+    if pd.notna(created):
+        state['CreatedDt:'] = max(created, pd.Timestamp(state.get('CreatedDt:', created))).isoformat()
+    return state
+
+
+# Build the columnar store from one or more city exports or cleaned CSVs,
+# streamed in validated chunks (rejected rows go to `report`). Returns the
+# number of rows stored. The ingest high-water mark is set to the newest
+# filing stored, so later ingests only read what comes after it.
+def build_store(csv_paths, path, chunk_rows=CHUNK_ROWS, report=None):
+    clear_store(path)
+    state = {}
+    with StoreWriter(path) as writer:
+        for csv_path in csv_paths:
+            for chunk, rejected in read_export(csv_path, chunk_rows):
+                if report is not None:
+                    report.add(csv_path, rejected)
+                if not chunk.empty:
+                    chunk = prepare(derive_calendar_columns(chunk))
+                    writer.append(chunk)
+                    state = updated_state(state, chunk)
+    if state:
+        write_state(path, state)
+    return writer.rows
+
+
+# Load the dashboard dataset, preferring the columnar store over the CSV.
+# `columns` projects the store read; stores without all of them (built before
+# the candidate and donor ids) are read whole.
+def load_dataset(data_dir=DATA, memory_map=False, columns=None):
+    store_path = Path.joinpath(data_dir, STORE_FILE)
+    if store_path.exists():
+        parts = _parts(store_path)
+        if columns is not None and not (parts and set(columns) <= set(pq.read_schema(parts[0]).names)):
+            columns = None
+        with metrics.phase('store read'):
+            return pd.read_parquet(store_path, engine='pyarrow', columns=columns, memory_map=memory_map)
+    return load_csv(data_dir)
+
+
+# Candidate dimension saved with the store, or candidate ids assigned to the
+# frame when loading the CSV. Returns the frame and the dimension.
+def load_candidates(df, data_dir=DATA):
+    candidates_path = Path.joinpath(data_dir, STORE_FILE, CANDIDATES_FILE)
+    if candidates_path.exists() and CANDIDATE_ID in df.columns:
+        return df, pd.read_parquet(candidates_path)
+    return assign_candidate_ids(df)
+
+
+# Donor dimension saved with the store, or donor ids assigned to the frame
+# when loading the CSV. Returns the frame and the dimension.
+def load_donors(df, data_dir=DATA):
+    donors_path = Path.joinpath(data_dir, STORE_FILE, DONORS_FILE)
+    if donors_path.exists() and DONOR_ID in df.columns:
+        return df, pd.read_parquet(donors_path)
+    return assign_donor_ids(df)
+
+
+# Rollups saved with the store, or built from the frame when loading the CSV
+def load_aggregates(df, data_dir=DATA):
+    aggregates_path = Path.joinpath(data_dir, STORE_FILE, AGGREGATES_DIR)
+    if aggregates_path.exists():
+        return AggregateCube.load(aggregates_path)
+    return AggregateCube.from_transactions(df)
+
+
+# Query backend over the rollups (QUERY_BACKEND): the store's SQLite file, one
+# built from the rollups for the CSV (or a store from before the file), or
+# the in-memory frames
+def load_query_backend(cube, data_dir=DATA, backend=QUERY_BACKEND):
+    if backend == 'pandas':
+        return PandasBackend(cube)
+    if backend != 'sqlite':
+        raise ValueError(f"Unknown QUERY_BACKEND {backend!r} (expected 'pandas' or 'sqlite')")
+    db_path = Path.joinpath(data_dir, STORE_FILE, QUERY_DB_FILE)
+    if db_path.exists():
+        return SQLiteBackend(db_path)
+    return SQLiteBackend.from_cube(cube)
+
+
+# Original loader: read the CSV and parse dates on every start (the store
+# holds them parsed)
+def load_csv(data_dir=DATA):
+    with metrics.phase('csv read'):
+        df = pd.read_csv(Path.joinpath(data_dir, CSV_FILE))
+    with metrics.phase('date parse'):
+        df['TransDate:'] = parse_date_column(df['TransDate:'])
+    return df
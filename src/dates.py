@@ -0,0 +1,55 @@
+import calendar
+
+import numpy as np
+import pandas as pd
+
+# Date formats, tried in order: raw exports ('1/15/25 15:13', '5/3/25') and
+# cleaned CSVs ('2025-01-15')
+DATE_FORMATS = ['%m/%d/%y %H:%M', '%m/%d/%y', '%Y-%m-%d', '%Y-%m-%d %H:%M:%S']
+
+# Month names in calendar order, stored as categoricals (12 codes instead of a
+# string per row)
+MONTH_NAMES = pd.CategoricalDtype(list(calendar.month_name)[1:], ordered=True)
+
+# Calendar columns derived from each date column, by prefix
+CALENDAR_COLUMNS = [('Election', 'Election Date:'), ('Created', 'CreatedDt:'), ('Trans', 'TransDate:')]
+# Date columns kept at day resolution
+NORMALIZED_COLUMNS = ['TransDate:', 'CreatedDt:']
+
+
+# Parse a column of date strings with DATE_FORMATS (NaT where none match).
+# Exports repeat a few thousand distinct dates across all their rows, so only
+# the distinct values are parsed. Columns already parsed are returned as-is.
+def parse_date_column(values, formats=DATE_FORMATS):
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques, dtype=object).astype(str)
+    parsed = pd.Series(pd.NaT, index=uniques.index, dtype='datetime64[ns]')
+    for fmt in formats:
+        pending = parsed.isna()
+        if not pending.any():
+            break
+        parsed[pending] = pd.to_datetime(uniques[pending], format=fmt, errors='coerce')
+    dates = np.append(parsed.to_numpy(), np.datetime64('NaT', 'ns'))[codes]
+    return pd.Series(dates, index=values.index, name=values.name)
+
+
+# Month name categorical of a date column (NaN where the date is missing)
+def month_names(dates):
+    codes = dates.dt.month.fillna(0).to_numpy().astype('int8') - 1
+    return pd.Series(pd.Categorical.from_codes(codes, dtype=MONTH_NAMES), index=dates.index)
+
+
+# Year, month name and day columns for the election, created and transaction
+# dates (previously derived by hand in syntax_date_updates.ipynb), with the
+# created and transaction dates normalized to the day
+def derive_calendar_columns(df):
+    df = df.copy()
+    for column in NORMALIZED_COLUMNS:
+        df[column] = df[column].dt.normalize()
+    for prefix, column in CALENDAR_COLUMNS:
+        df[f'{prefix} Year'] = df[column].dt.year.astype('Int64')
+        df[f'{prefix} Month'] = month_names(df[column])
+        df[f'{prefix} Day'] = df[column].dt.day.astype('Int64')
+    return df
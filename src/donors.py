@@ -0,0 +1,136 @@
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from candidates import CANDIDATE_ID, name_ranks
+from metrics import metrics
+
+# Integer donor id given to every contributor row (missing for other rows)
+DONOR_ID = 'Donor Id'
+# Columns of the donor dimension, indexed by donor id
+DIMENSION_COLUMNS = ['Donor Key', 'ZipCode', 'Name:']
+
+
+# Comparable form of donor names: the first line only (raw exports carry the
+# street address and city on the following lines), case-folded, '&' spelled
+# out, punctuation dropped and whitespace collapsed
+def normalize_names(names):
+    names = names.astype('string').str.split('\n', n=1).str[0]
+    names = names.str.casefold().str.replace('&', ' and ', regex=False)
+    names = names.str.replace(r'[^\w\s]', '', regex=True)
+    return names.str.split().str.join(' ')
+
+
+def _contributor_keys(df):
+    contributors = df['Contact Type:'] == 'Contributor'
+    keys = pd.DataFrame({
+        'Donor Key': normalize_names(df.loc[contributors, 'Name:']),
+        'ZipCode': df.loc[contributors, 'ZipCode'].astype('string').fillna(''),
+        'Name:': df.loc[contributors, 'Name:'].astype('string').str.split('\n', n=1).str[0],
+    })
+    return keys[keys['Donor Key'].notna() & (keys['Donor Key'] != '')]
+
+
+def empty_dimension():
+    dimension = pd.DataFrame({column: pd.Series(dtype='string') for column in DIMENSION_COLUMNS})
+    dimension.index = pd.Index([], dtype='int32', name=DONOR_ID)
+    return dimension
+
+
+# Add a donor id column to a frame of transactions. Donors are identified by
+# normalized name + zip code; keys already in `dimension` (the store's donors)
+# keep their ids and new ones are numbered after them. Returns the frame and
+# the extended dimension.
+def assign_donor_ids(df, dimension=None):
+    if dimension is None:
+        dimension = empty_dimension()
+    keys = _contributor_keys(df)
+    known = pd.MultiIndex.from_frame(dimension[['Donor Key', 'ZipCode']])
+
+    new = keys.drop_duplicates(['Donor Key', 'ZipCode'])
+    new = new[~pd.MultiIndex.from_frame(new[['Donor Key', 'ZipCode']]).isin(known)]
+    new.index = pd.RangeIndex(len(dimension), len(dimension) + len(new), name=DONOR_ID).astype('int32')
+    dimension = pd.concat([dimension, new[DIMENSION_COLUMNS]]) if len(new) else dimension
+
+    positions = pd.MultiIndex.from_frame(dimension[['Donor Key', 'ZipCode']]).get_indexer(
+        pd.MultiIndex.from_frame(keys[['Donor Key', 'ZipCode']]))
+    df = df.copy()
+    df[DONOR_ID] = pd.Series(pd.NA, index=df.index, dtype='Int32')
+    df.loc[keys.index, DONOR_ID] = dimension.index.to_numpy()[positions]
+    return df, dimension
+
+
+# Row positions grouped by an integer code, CSR style: the rows for code c are
+# rows[offsets[c]:offsets[c + 1]], in ascending order. Negative codes are left out.
+def _posting_lists(codes, n_codes):
+    rows = np.argsort(codes, kind='stable')
+    rows = rows[np.searchsorted(codes[rows], 0):]
+    offsets = np.searchsorted(codes[rows], np.arange(n_codes + 1))
+    return rows, offsets
+
+
+class DonorIndex:
+    """Donor dimension plus the transaction rows of each donor and candidate.
+
+    Posting lists hold row positions into the snapshot frame, so "everything
+    this donor gave" is a slice of one array rather than a scan.
+    """
+
+    def __init__(self, df, dimension):
+        self.df = df
+        self.dimension = dimension
+        codes = df[DONOR_ID].fillna(-1).to_numpy(dtype='int64')
+        self._donor_rows, self._donor_offsets = _posting_lists(codes, len(dimension))
+
+        candidates = df[CANDIDATE_ID].fillna(-1).to_numpy(dtype='int64')
+        self._candidate_rows, self._candidate_offsets = _posting_lists(candidates, candidates.max(initial=-1) + 1)
+
+    def __len__(self):
+        return len(self.dimension)
+
+    # Transaction rows of a donor, optionally only those to some candidates
+    def rows(self, donor_id, candidates=None):
+        if donor_id is None or not 0 <= donor_id < len(self.dimension):
+            return np.array([], dtype='int64')
+        rows = self._donor_rows[self._donor_offsets[donor_id]:self._donor_offsets[donor_id + 1]]
+        if candidates:
+            rows = np.intersect1d(rows, self.candidate_rows(candidates), assume_unique=True)
+        return rows
+
+    # Transaction rows of one or more candidates (by candidate id)
+    def candidate_rows(self, candidates):
+        if not isinstance(candidates, (list, tuple)):
+            candidates = [candidates]
+        codes = [code for code in candidates if 0 <= code < len(self._candidate_offsets) - 1]
+        return np.sort(np.concatenate(
+            [self._candidate_rows[self._candidate_offsets[code]:self._candidate_offsets[code + 1]]
+             for code in codes] or [np.array([], dtype='int64')]))
+
+    # Transactions of a donor
+    def donations(self, donor_id, candidates=None):
+        rows = self.rows(donor_id, candidates)
+        metrics.count_scanned(len(rows))
+        return self.df.iloc[rows]
+
+    # Donor ids whose normalized name contains the query, most transactions first
+    def search(self, query, limit=20):
+        query = normalize_names(pd.Series([query])).iloc[0]
+        if pd.isna(query) or not query:
+            return []
+        matches = self.dimension.index[self.dimension['Donor Key'].str.contains(query, regex=False).to_numpy()]
+        counts = self._donor_offsets[matches + 1] - self._donor_offsets[matches]
+        return matches[np.argsort(-counts, kind='stable')][:limit].tolist()
+
+    # Dropdown label for a donor
+    def label(self, donor_id):
+        donor = self.dimension.loc[donor_id]
+        return f"{donor['Name:']} ({donor['ZipCode']})" if donor['ZipCode'] else donor['Name:']
+
+    @cached_property
+    def name_ranks(self):
+        return name_ranks(self.dimension['Name:'])
+
+    # Add the donor name and zip code to a frame with a donor id column
+    def named(self, frame):
+        return frame.join(self.dimension[['Name:', 'ZipCode']], on=DONOR_ID)
@@ -0,0 +1,113 @@
+import csv
+
+import numpy as np
+import pandas as pd
+
+from dates import parse_date_column
+
+# Columns of a city campaign finance export and the type each is read as:
+# 'string', 'float', 'int' (whole numbers, stored as nullable integers; the
+# exports write ids and counts as floats such as '99.0') or 'date' (parsed with
+# dates.DATE_FORMATS). Calendar columns are derived from the dates, not read.
+EXPORT_SCHEMA = {
+    'Report Id:': 'string',
+    'Name:': 'string',
+    'Contact Type:': 'string',
+    'Report Type:': 'string',
+    'Amount:': 'float',
+    'strVal': 'string',
+    'Cand/Committee:': 'string',
+    'Election Date:': 'date',
+    'Id': 'int',
+    'ReportId': 'int',
+    'FilerName': 'string',
+    'Report Type Code:': 'string',
+    'Count:': 'int',
+    'TransDate:': 'date',
+    'CreatedDt:': 'date',
+    'ZipCode': 'string',
+    'ReportLink': 'string',
+}
+# Rows missing any of these are rejected
+REQUIRED_COLUMNS = ['Contact Type:', 'Cand/Committee:']
+
+# Rows per chunk; peak memory of an ingest grows with this, not the export
+CHUNK_ROWS = 50000
+
+
+# Typed frame of the valid rows of a raw chunk (all strings) and the rejected
+# rows, as read, with their 'Row' number and 'Error'
+def validate_chunk(chunk):
+    df = pd.DataFrame(index=chunk.index)
+    problems = []
+    for column, kind in EXPORT_SCHEMA.items():
+        raw = chunk[column]
+        if kind == 'string':
+            df[column] = raw.astype('string')
+            continue
+        if kind == 'date':
+            values = parse_date_column(raw)
+            invalid = raw.notna() & values.isna()
+        else:
+            values = pd.to_numeric(raw, errors='coerce')
+            invalid = raw.notna() & values.isna()
+            if kind == 'int':
+                invalid |= values.notna() & (values % 1 != 0)
+                values = values.where(~invalid).astype('Int64')
+        problems.append((invalid, f"bad {column} value"))
+        df[column] = values
+    problems.extend((chunk[column].isna(), f"missing {column}") for column in REQUIRED_COLUMNS)
+
+    bad = pd.Series(False, index=chunk.index)
+    for invalid, _ in problems:
+        bad |= invalid
+    # reasons are only spelled out for the rejected rows
+    errors = [[] for _ in range(int(bad.sum()))]
+    for invalid, message in problems:
+        for position in np.flatnonzero(invalid[bad].to_numpy()):
+            errors[position].append(message)
+    rejected = chunk[bad].assign(Row=chunk.index[bad] + 1, Error=['; '.join(error) for error in errors])
+    return df[~bad], rejected
+
+
+# Stream an export in chunks of validated, typed rows. Yields (rows, rejected)
+# per chunk; row numbers count records from 1 after the header.
+def read_export(path, chunk_rows=CHUNK_ROWS):
+    header = pd.read_csv(path, nrows=0).columns
+    missing = [column for column in EXPORT_SCHEMA if column not in header]
+    if missing:
+        raise ValueError(f"{path} is missing columns: {', '.join(missing)}")
+    chunks = pd.read_csv(path, dtype=str, usecols=list(EXPORT_SCHEMA), chunksize=chunk_rows)
+    for chunk in chunks:
+        yield validate_chunk(chunk)
+
+
+class BadRowReport:
+    """Rejected export rows: counted, with the first few kept for a summary,
+    and appended to a CSV (when a path is given) as they are found."""
+
+    def __init__(self, path=None, samples=5):
+        self.path = path
+        self.count = 0
+        self.samples = []
+        self._max_samples = samples
+        if path:
+            with open(path, 'w', newline='') as out:
+                csv.writer(out).writerow(['Source', 'Row', 'Error'] + list(EXPORT_SCHEMA))
+
+    def add(self, source, rejected):
+        if rejected.empty:
+            return
+        self.count += len(rejected)
+        for row, error in zip(rejected['Row'][:self._max_samples - len(self.samples)], rejected['Error']):
+            self.samples.append(f"{source} row {row}: {error}")
+        if self.path:
+            rows = rejected[['Row', 'Error'] + list(EXPORT_SCHEMA)]
+            rows.insert(0, 'Source', str(source))
+            rows.to_csv(self.path, mode='a', header=False, index=False)
+
+    def summary(self):
+        if not self.count:
+            return "no rows rejected"
+        lines = [f"{self.count} rows rejected" + (f" (see {self.path})" if self.path else "")]
+        return '\n'.join(lines + [f"  {sample}" for sample in self.samples])
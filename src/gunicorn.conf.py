@@ -0,0 +1,33 @@
+import gc
+import os
+
+bind = '0.0.0.0:8080'
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+
+# Import app.py once in the master before forking. Importing does not read the
+# data (see dataset.py); where it is loaded depends on PRELOAD_DATA.
+preload_app = True
+
+# 1: load the dataset in the master before forking, so every worker shares the
+# same copy-on-write pages. 0: each worker starts serving at once (the page
+# layout comes from the dimensions saved by the last load) and loads its own
+# copy in the background, for containers that must become ready quickly.
+PRELOAD_DATA = os.environ.get('PRELOAD_DATA', '1') == '1'
+
+
+# Move everything allocated during preload into the permanent generation so the
+# workers' garbage collector never writes to (and thereby copies) those pages
+def when_ready(server):
+    if PRELOAD_DATA:
+        from app import dataset
+        dataset.load()
+    gc.collect()
+    gc.freeze()
+
+
+# Each worker watches the data directory for new data drops (see dataset.py)
+def post_fork(server, worker):
+    from app import dataset
+    if not PRELOAD_DATA:
+        dataset.load_in_background()
+    dataset.start_watching()
@@ -0,0 +1,140 @@
+from collections import OrderedDict
+from functools import wraps
+from pathlib import Path
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+
+# Content hash of the dataset, used in cache keys so a new data drop never
+# serves results computed from the old one
+def dataset_version(df):
+    hashes = pd.util.hash_pandas_object(df, index=False).values
+    return hashlib.sha1(hashes.tobytes()).hexdigest()[:16]
+
+
+# Callback inputs that mean the same query map to the same key: candidate
+# lists are order-insensitive and None/''/[] all mean "no filter"
+def normalize(value):
+    if value is None or value == '' or value == []:
+        return None
+    if isinstance(value, (list, tuple)):
+        return tuple(sorted(value))
+    return value
+
+
+class LRUCache:
+    """Bounded in-process cache with least-recently-used eviction."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return True, self._data[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data), 'maxsize': self.maxsize}
+
+
+class FileCache:
+    """LRU cache in a local SQLite file, shared by every worker on the host."""
+
+    def __init__(self, path, maxsize=1024):
+        self.path = Path(path)
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+
+    # One connection per process and thread; workers forked after preload
+    # must not reuse the master's connection
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS cache '
+                         '(key TEXT PRIMARY KEY, value BLOB, accessed REAL)')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        conn = self._connect()
+        key = repr(key)
+        row = conn.execute('SELECT value FROM cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return False, None
+        conn.execute('UPDATE cache SET accessed = ? WHERE key = ?', (time.time(), key))
+        self.hits += 1
+        return True, pickle.loads(row[0])
+
+    def set(self, key, value):
+        conn = self._connect()
+        conn.execute('INSERT OR REPLACE INTO cache VALUES (?, ?, ?)',
+                     (repr(key), pickle.dumps(value, pickle.HIGHEST_PROTOCOL), time.time()))
+        conn.execute('DELETE FROM cache WHERE key NOT IN '
+                     '(SELECT key FROM cache ORDER BY accessed DESC LIMIT ?)', (self.maxsize,))
+
+    def clear(self):
+        self._connect().execute('DELETE FROM cache')
+
+    def stats(self):
+        size = self._connect().execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        return {'hits': self.hits, 'misses': self.misses, 'size': size, 'maxsize': self.maxsize}
+
+
+# In-process LRU by default; set CALLBACK_CACHE_DIR to share results between
+# gunicorn workers through a file-backed cache
+def make_cache():
+    maxsize = int(os.environ.get('CALLBACK_CACHE_SIZE', 256))
+    cache_dir = os.environ.get('CALLBACK_CACHE_DIR')
+    if cache_dir:
+        return FileCache(Path.joinpath(Path(cache_dir), 'callbacks.sqlite'), maxsize)
+    return LRUCache(maxsize)
+
+
+# Cache a callback's result keyed on its name, the dataset version and its
+# normalized inputs. `version` is called on every request so a dataset swap
+# changes the key.
+def memoize(cache, version):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args):
+            key = (func.__name__, version(), tuple(normalize(arg) for arg in args))
+            found, result = cache.get(key)
+            if found:
+                return result
+            result = func(*args)
+            cache.set(key, result)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,145 @@
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+import contextvars
+import cProfile
+import io
+import os
+import pstats
+import random
+import threading
+import time
+
+# Rows scanned by the callback running in the current context
+_rows_scanned = contextvars.ContextVar('rows_scanned', default=None)
+
+
+# Rows in a callback result: table records, or points across figure traces
+# (summed over the outputs of callbacks with several)
+def rows_returned(result):
+    if isinstance(result, tuple):
+        return sum(rows_returned(output) for output in result)
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict) and 'data' in result:
+        return sum(len(trace.get('x', [])) for trace in result['data'])
+    return 0
+
+
+def _percentile(samples, q):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class CallbackStats:
+    """Wall time and row counts for one callback."""
+
+    def __init__(self, slowest=10):
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows_scanned = 0
+        self.rows_returned = 0
+        self.samples = deque(maxlen=1000)
+        self.slowest = []
+        self._keep = slowest
+
+    def add(self, seconds, scanned, returned, args):
+        self.calls += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.rows_scanned += scanned
+        self.rows_returned += returned
+        self.samples.append(seconds)
+        # the slowest inputs seen, to spot expensive year/candidate combinations
+        self.slowest.append({'ms': seconds * 1000, 'args': repr(args), 'rows_scanned': scanned})
+        self.slowest = sorted(self.slowest, key=lambda call: call['ms'], reverse=True)[:self._keep]
+
+    def as_dict(self):
+        return {
+            'calls': self.calls,
+            'mean_ms': self.total_seconds / self.calls * 1000 if self.calls else None,
+            'p50_ms': (_percentile(self.samples, 0.5) or 0) * 1000,
+            'p95_ms': (_percentile(self.samples, 0.95) or 0) * 1000,
+            'max_ms': self.max_seconds * 1000,
+            'rows_scanned': self.rows_scanned,
+            'rows_returned': self.rows_returned,
+            'slowest': self.slowest,
+        }
+
+
+class Metrics:
+    """Per-process callback, response and startup timings."""
+
+    def __init__(self):
+        self.callbacks = {}
+        self.responses = {}
+        self.startup = {}
+        self.profiles = deque(maxlen=20)
+        # Fraction of callback calls run under cProfile (0 disables)
+        self.profile_rate = float(os.environ.get('METRICS_PROFILE_RATE', 0))
+        self._lock = threading.Lock()
+
+    # Time a named startup phase (last run wins, so reloads overwrite it)
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        yield
+        self.startup[name] = (time.perf_counter() - start) * 1000
+
+    # Called by the data layer with the number of rows a query scanned
+    def count_scanned(self, rows):
+        scanned = _rows_scanned.get()
+        if scanned is not None:
+            scanned[0] += rows
+
+    # Record wall time, rows scanned and rows returned for every call
+    def instrument(self, func):
+        @wraps(func)
+        def wrapper(*args):
+            scanned = [0]
+            token = _rows_scanned.set(scanned)
+            profiler = cProfile.Profile() if random.random() < self.profile_rate else None
+            start = time.perf_counter()
+            try:
+                if profiler:
+                    result = profiler.runcall(func, *args)
+                else:
+                    result = func(*args)
+            finally:
+                seconds = time.perf_counter() - start
+                _rows_scanned.reset(token)
+            with self._lock:
+                stats = self.callbacks.setdefault(func.__name__, CallbackStats())
+                stats.add(seconds, scanned[0], rows_returned(result), args)
+                if profiler:
+                    self.profiles.append(self._profile_summary(func.__name__, args, seconds, profiler))
+            return result
+        return wrapper
+
+    def _profile_summary(self, name, args, seconds, profiler):
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(15)
+        return {'callback': name, 'args': repr(args), 'ms': seconds * 1000, 'stats': out.getvalue()}
+
+    # Serialized response size per callback output
+    def record_response(self, output, nbytes):
+        with self._lock:
+            response = self.responses.setdefault(output, {'responses': 0, 'total_bytes': 0, 'max_bytes': 0})
+            response['responses'] += 1
+            response['total_bytes'] += nbytes
+            response['max_bytes'] = max(response['max_bytes'], nbytes)
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'startup_ms': dict(self.startup),
+                'callbacks': {name: stats.as_dict() for name, stats in self.callbacks.items()},
+                'responses': {output: dict(response) for output, response in self.responses.items()},
+            }
+
+
+metrics = Metrics()
@@ -0,0 +1,151 @@
+from contextlib import closing
+from pathlib import Path
+import os
+import sqlite3
+import tempfile
+import threading
+import weakref
+
+import pandas as pd
+
+from aggregates import CATEGORICAL_KEYS, DAILY_KEYS, DONOR_KEYS
+from candidates import CANDIDATE_ID
+from donors import DONOR_ID
+from metrics import metrics
+
+# Backend the callbacks query the rollups through: 'pandas' filters the
+# in-memory frames, 'sqlite' runs indexed queries on a database file of them
+QUERY_BACKEND = os.environ.get('QUERY_BACKEND', 'pandas')
+
+# SQL names of the rollup columns
+SQL_COLUMNS = {
+    'Election Year': 'year',
+    CANDIDATE_ID: 'candidate',
+    DONOR_ID: 'donor',
+    'Contact Type:': 'contact_type',
+    'strVal': 'str_val',
+    'TransDate:': 'day',
+    'sum': 'amount_sum',
+    'count': 'amount_count',
+    'size': 'row_count',
+}
+MEASURES = ['sum', 'count', 'size']
+
+# Daily rows are looked up by year and/or candidates and read in date order;
+# donor rows by year and candidates
+INDEXES = """
+CREATE INDEX daily_year_candidate_day ON daily (year, candidate, day);
+CREATE INDEX daily_candidate_day ON daily (candidate, day);
+CREATE INDEX donors_year_candidate ON donors (year, candidate);
+"""
+
+
+class PandasBackend:
+    """Rollup queries answered from the in-memory AggregateCube."""
+
+    def __init__(self, cube):
+        self.cube = cube
+
+    def daily(self, year=None, candidates=None, contact_type=None, str_val=None):
+        return self.cube.daily_slice(year, candidates, contact_type, str_val)
+
+    def donors(self, year, candidates=None):
+        return self.cube.donor_slice(year, candidates)
+
+
+# Rollup frame in SQL form: short column names, dates as days since 1970-01-01
+def _to_sql_frame(frame):
+    frame = frame.rename(columns=SQL_COLUMNS)
+    if 'day' in frame.columns:
+        days = frame['day'].to_numpy().astype('datetime64[D]').astype('int64')
+        frame['day'] = pd.Series(days, index=frame.index).where(frame['day'].notna())
+    return frame
+
+
+# Write the daily and donor rollups of a cube to an indexed SQLite file
+def write_query_db(cube, path):
+    path = Path(path)
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.unlink(missing_ok=True)
+    with closing(sqlite3.connect(tmp)) as connection:
+        _to_sql_frame(cube.daily).to_sql('daily', connection, index=False)
+        _to_sql_frame(cube.donors).to_sql('donors', connection, index=False)
+        connection.executescript(INDEXES)
+        connection.execute('ANALYZE')
+        connection.commit()
+    os.replace(tmp, path)
+
+
+class SQLiteBackend:
+    """Rollup queries pushed down to an indexed SQLite file.
+
+    Filters become WHERE clauses on the indexed year/candidate/date columns,
+    so a query reads only the matching rows. Connections are read-only and
+    opened per thread and per process (the file may be opened before gunicorn
+    forks).
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._local = threading.local()
+
+    # Database built from a cube in a temporary file, for data without a
+    # store (the CSV); the file is removed with the backend
+    @classmethod
+    def from_cube(cls, cube):
+        fd, path = tempfile.mkstemp(suffix='.sqlite')
+        os.close(fd)
+        write_query_db(cube, path)
+        backend = cls(path)
+        weakref.finalize(backend, os.unlink, path)
+        return backend
+
+    def _connection(self):
+        if getattr(self._local, 'pid', None) != os.getpid():
+            self._local.connection = sqlite3.connect(self.path.as_uri() + '?mode=ro', uri=True)
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def _select(self, table, keys, where, params):
+        columns = ', '.join(f'{SQL_COLUMNS[column]} AS "{column}"' for column in keys + MEASURES)
+        sql = f'SELECT {columns} FROM {table}' + (' WHERE ' + ' AND '.join(where) if where else '')
+        frame = pd.read_sql_query(sql, self._connection(), params=params)
+        metrics.count_scanned(len(frame))
+
+        # the dtypes of the in-memory rollups
+        frame['Election Year'] = frame['Election Year'].astype('Int64')
+        frame[CANDIDATE_ID] = frame[CANDIDATE_ID].astype('Int32')
+        if DONOR_ID in frame.columns:
+            frame[DONOR_ID] = frame[DONOR_ID].astype('Int32')
+        for column in CATEGORICAL_KEYS:
+            if column in frame.columns:
+                frame[column] = frame[column].astype('category')
+        if 'TransDate:' in frame.columns:
+            frame['TransDate:'] = pd.to_datetime(frame['TransDate:'], unit='D')
+        return frame.astype({'sum': 'float64', 'count': 'int64', 'size': 'int64'})
+
+    # Daily rollup for a year (None for all years), optionally narrowed to
+    # candidate ids, a contact type and/or a strVal
+    def daily(self, year=None, candidates=None, contact_type=None, str_val=None):
+        where, params = [], []
+        if year:
+            where.append('year = ?')
+            params.append(int(year))
+        if candidates:
+            where.append(f"candidate IN ({', '.join('?' * len(candidates))})")
+            params.extend(int(candidate) for candidate in candidates)
+        if contact_type:
+            where.append('contact_type = ?')
+            params.append(contact_type)
+        if str_val:
+            where.append('str_val = ?')
+            params.append(str_val)
+        return self._select('daily', DAILY_KEYS, where, params)
+
+    # Donor x candidate rollup of contributions for a single election year
+    def donors(self, year, candidates=None):
+        where, params = ['year = ?'], [int(year) if year else None]
+        if candidates:
+            where.append(f"candidate IN ({', '.join('?' * len(candidates))})")
+            params.extend(int(candidate) for candidate in candidates)
+        return self._select('donors', DONOR_KEYS, where, params)
@@ -0,0 +1,99 @@
+import gzip
+
+from dash.fingerprint import check_fingerprint
+from flask import Response, request
+
+from memo import LRUCache
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_SIZE = 500
+COMPRESSIBLE_TYPES = {'application/json', 'text/html', 'text/css', 'application/javascript',
+                      'text/javascript', 'image/svg+xml'}
+
+# Compressed bodies of static files (component bundles, assets), by path,
+# version and encoding, so each is compressed once
+_compressed = LRUCache(64)
+
+
+# Best encoding the client accepts: brotli when available, else gzip
+def _encoding():
+    if brotli is not None and request.accept_encodings['br']:
+        return 'br'
+    if request.accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+# Key of a response in _compressed, or None when its body is not static.
+# Responses with an ETag are keyed on it. Fingerprinted component bundles
+# ('dash_table.v5_2_12m1726.min.js') have no ETag, but their URL changes
+# whenever the file does, so the path alone identifies the body.
+def _cache_key(response, encoding):
+    etag = response.get_etag()[0]
+    if etag:
+        return request.path, etag, encoding
+    if '/_dash-component-suites/' in request.path and check_fingerprint(request.path)[1]:
+        return request.path, None, encoding
+    return None
+
+
+def _compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
+
+# Compress a response body (callback JSON, layout, index, scripts) with
+# brotli or gzip when the client accepts it
+def compress_response(response):
+    if (response.status_code != 200 or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = _encoding()
+    if encoding is None:
+        return response
+    response.direct_passthrough = False
+    data = response.get_data()
+    if len(data) < MIN_SIZE:
+        return response
+
+    key = _cache_key(response, encoding)
+    if key:
+        found, body = _compressed.get(key)
+        if not found:
+            body = _compress(data, encoding)
+            _compressed.set(key, body)
+    else:
+        body = _compress(data, encoding)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+# Validators for a response that only changes with `etag` (weak, so it
+# holds for every encoding); browsers revalidate it on each use
+def set_validators(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response
+
+
+# 304 response when the request's If-None-Match / If-Modified-Since still
+# match, else None
+def not_modified(etag, last_modified):
+    if request.if_none_match:
+        matched = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since:
+        matched = last_modified.replace(microsecond=0) <= request.if_modified_since
+    else:
+        return None
+    if not matched:
+        return None
+    return set_validators(Response(status=304), etag, last_modified)
@@ -0,0 +1,151 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from candidates import CANDIDATE_ID
+from metrics import metrics
+
+# Most points drawn per time-series trace. Longer curves are bucketed to a
+# coarser resolution, then thinned with LTTB if still too long.
+MAX_POINTS = int(os.environ.get('TIMESERIES_MAX_POINTS', 500))
+
+# Bucket widths from finest to coarsest, with their approximate length in days
+RESOLUTIONS = [('D', 1), ('W', 7), ('M', 30.4)]
+
+
+# Finest bucket width that keeps a date range within max_points per trace
+def resolution(start, end, max_points=MAX_POINTS):
+    if pd.isna(start) or pd.isna(end):
+        return 'D'
+    days = (end - start).days + 1
+    for freq, length in RESOLUTIONS:
+        if days / length <= max_points:
+            return freq
+    return RESOLUTIONS[-1][0]
+
+
+# Positions of the points kept by Largest-Triangle-Three-Buckets downsampling:
+# the first and last point plus, from each bucket in between, the point
+# forming the largest triangle with the previous kept point and the next
+# bucket's average
+def lttb(x, y, threshold):
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    every = (n - 2) / (threshold - 2)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        kept[i + 1] = a
+    return kept
+
+
+# Line traces of a cumulative column, one per candidate. Rows must be sorted by
+# candidate name and date. Curves keep the last point of each bucket (so every
+# drawn value is exact) at the resolution the plotted range allows, and traces
+# are split from the frame in a single pass.
+def cumulative_traces(df, column, max_points=MAX_POINTS):
+    freq = resolution(df['TransDate:'].min(), df['TransDate:'].max(), max_points)
+    if freq != 'D':
+        buckets = df['TransDate:'].dt.to_period(freq)
+        names = df['Cand/Committee:']
+        df = df[(buckets != buckets.shift(-1)) | (names != names.shift(-1))]
+
+    traces = []
+    for name, trace in df.groupby('Cand/Committee:', sort=False):
+        x, y = trace['TransDate:'], trace[column]
+        if len(trace) > max_points:
+            kept = lttb(x.to_numpy().astype('int64') / 1e9, y.to_numpy(dtype=float), max_points)
+            x, y = x.iloc[kept], y.iloc[kept]
+        traces.append({'x': x, 'y': y, 'type': 'line', 'name': name})
+    return traces
+
+
+# Date range slider positions are whole days since 1970-01-01
+def to_day(timestamp):
+    return int(pd.Timestamp(timestamp).normalize().value // 86_400_000_000_000)
+
+
+def from_day(day):
+    return pd.Timestamp(day, unit='D')
+
+
+# Slider marks: month starts for ranges up to a year, quarter starts up to
+# three years, else year starts
+def date_marks(first_day, last_day):
+    start, end = from_day(first_day), from_day(last_day)
+    days = (end - start).days
+    if days <= 366:
+        dates, fmt = pd.date_range(start, end, freq='MS'), '%b %Y'
+    elif days <= 3 * 366:
+        dates, fmt = pd.date_range(start, end, freq='QS'), '%b %Y'
+    else:
+        dates, fmt = pd.date_range(start, end, freq='YS'), '%Y'
+    return {to_day(date): date.strftime(fmt) for date in dates}
+
+
+class CumulativeSeries:
+    """Running totals of one measure per candidate, built once at load time.
+
+    For every (election year, candidate) pair, and for each candidate across
+    all years (year None), holds the sorted transaction dates and the prefix
+    sums of the daily amounts, so the curve over any date range is two binary
+    searches and a slice.
+    """
+
+    def __init__(self, daily, contact_type=None, str_val=None):
+        if contact_type:
+            daily = daily[daily['Contact Type:'] == contact_type]
+        if str_val:
+            daily = daily[daily['strVal'] == str_val]
+        self._series = {}
+        self._candidates = {}
+        self._add(None, daily)
+        for year, frame in daily.groupby('Election Year', observed=True):
+            self._add(year, frame)
+
+    def _add(self, year, daily):
+        sums = daily.groupby([CANDIDATE_ID, 'TransDate:'])['sum'].sum()
+        candidate_ids = sums.index.get_level_values(0).to_numpy(dtype='int64')
+        dates = sums.index.get_level_values(1).to_numpy()
+        totals = sums.groupby(level=0).cumsum().to_numpy()
+        # candidates are contiguous in the sorted index
+        starts = np.flatnonzero(np.r_[True, candidate_ids[1:] != candidate_ids[:-1]])
+        ends = np.r_[starts[1:], len(candidate_ids)]
+        for start, end in zip(starts, ends):
+            self._series[(year, int(candidate_ids[start]))] = (dates[start:end], totals[start:end])
+        self._candidates[year] = [int(candidate_ids[start]) for start in starts]
+
+    # Dates and running totals of one candidate, limited to a date range.
+    # Totals include everything before the range, as on the full curve.
+    def query(self, year, candidate_id, start=None, end=None):
+        dates, totals = self._series.get((year, candidate_id), (np.array([], dtype='datetime64[ns]'), np.array([])))
+        lo = np.searchsorted(dates, np.datetime64(start), 'left') if start is not None else 0
+        hi = np.searchsorted(dates, np.datetime64(end), 'right') if end is not None else len(dates)
+        return dates[lo:hi], totals[lo:hi]
+
+    # Long frame (candidate id, date, running total) for some candidates (all
+    # with data in the year when None) over a date range
+    def frame(self, year, candidates=None, start=None, end=None):
+        year = year or None
+        columns = {CANDIDATE_ID: [], 'TransDate:': [], 'Cumulative': []}
+        for candidate_id in candidates or self._candidates.get(year, []):
+            dates, totals = self.query(year, candidate_id, start, end)
+            metrics.count_scanned(len(dates))
+            columns[CANDIDATE_ID].append(np.full(len(dates), candidate_id))
+            columns['TransDate:'].append(dates)
+            columns['Cumulative'].append(totals)
+        return pd.DataFrame({
+            CANDIDATE_ID: np.concatenate(columns[CANDIDATE_ID] or [np.array([], dtype='int64')]),
+            'TransDate:': pd.to_datetime(np.concatenate(columns['TransDate:'] or [np.array([], dtype='datetime64[ns]')])),
+            'Cumulative': np.concatenate(columns['Cumulative'] or [np.array([])]),
+        })
@@ -0,0 +1,132 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# DataTable filter operators (filter_action='custom'), longest symbols first
+OPERATORS = [['ge ', '>='],
+             ['le ', '<='],
+             ['lt ', '<'],
+             ['gt ', '>'],
+             ['ne ', '!='],
+             ['eq ', '='],
+             ['contains '],
+             ['datestartswith ']]
+
+
+# One "{column} op value" clause of a DataTable filter query
+def split_filter_part(filter_part):
+    for operator_type in OPERATORS:
+        for operator in operator_type:
+            if operator in filter_part:
+                name_part, value_part = filter_part.split(operator, 1)
+                name = name_part[name_part.find('{') + 1: name_part.rfind('}')]
+
+                value_part = value_part.strip()
+                v0 = value_part[0] if value_part else ''
+                if v0 == value_part[-1:] and v0 in ("'", '"', '`'):
+                    value = value_part[1: -1].replace('\\' + v0, v0)
+                else:
+                    try:
+                        value = float(value_part)
+                    except ValueError:
+                        value = value_part
+
+                # word operators need spaces after them in the filter string,
+                # but we don't want these later
+                return name, operator_type[0].strip(), value
+
+    return [None] * 3
+
+
+def _is_numeric(column):
+    return pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column)
+
+
+# A filter value in the column's type: a number for numeric columns, text for
+# the rest (a typed 78209 matches the zip code '78209'); None when it cannot
+# be converted
+def coerce_value(column, value):
+    if _is_numeric(column):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+# Boolean mask of the rows matching a DataTable filter query. Comparisons
+# whose value does not fit the column's type are ignored.
+def filter_mask(df, filter_query):
+    mask = np.ones(len(df), dtype=bool)
+    if not filter_query:
+        return mask
+    for filter_part in filter_query.split(' && '):
+        col_name, operator, filter_value = split_filter_part(filter_part)
+        if col_name not in df.columns:
+            continue
+        column = df[col_name]
+        if operator in ('eq', 'ne', 'lt', 'le', 'gt', 'ge'):
+            value = coerce_value(column, filter_value)
+            if value is None:
+                continue
+            if not _is_numeric(column):
+                column = column.astype('string')
+            mask &= getattr(column, operator)(value).fillna(False).to_numpy(dtype=bool)
+        elif operator == 'contains':
+            mask &= column.astype(str).str.contains(str(filter_value), case=False, regex=False).to_numpy()
+        elif operator == 'datestartswith':
+            mask &= column.astype(str).str.startswith(str(filter_value)).to_numpy()
+    return mask
+
+
+class PagedTable:
+    """A complete table result served a page at a time.
+
+    Row orders for each sort column are computed on first use and kept, so
+    paging through a sorted view never re-sorts; filters are applied to the
+    pre-sorted order.
+    """
+
+    def __init__(self, df):
+        self.df = df.reset_index(drop=True)
+        self._orders = {}
+
+    def __len__(self):
+        return len(self.df)
+
+    # Row positions sorted by a column (missing values last either way); text
+    # sorts case-insensitively
+    def order(self, column, descending):
+        key = (column, descending)
+        if key not in self._orders:
+            values = self.df[column]
+            if not _is_numeric(values) and not pd.api.types.is_datetime64_any_dtype(values):
+                values = values.astype('string').str.lower()
+            order = values.sort_values(ascending=not descending, kind='stable', na_position='last').index
+            self._orders[key] = order.to_numpy()
+        return self._orders[key]
+
+    # Records of one page plus the page count and the (clamped) page number.
+    # Sorts on columns the table does not have (e.g. on the empty table) are
+    # ignored.
+    def page(self, page_current, page_size, sort_by=None, filter_query=None):
+        if not page_size or page_size <= 0:
+            return [], 1, 0
+        if sort_by and sort_by[0]['column_id'] in self.df.columns:
+            rows = self.order(sort_by[0]['column_id'], sort_by[0]['direction'] == 'desc')
+        else:
+            rows = np.arange(len(self.df))
+        if filter_query:
+            rows = rows[filter_mask(self.df, filter_query)[rows]]
+
+        page_count = max(1, math.ceil(len(rows) / page_size))
+        page_current = min(page_current or 0, page_count - 1)
+        start = page_current * page_size
+        records = self.df.iloc[rows[start:start + page_size]].to_dict('records')
+        return records, page_count, page_current
+
+
+EMPTY = PagedTable(pd.DataFrame())
@@ -0,0 +1,45 @@
+from pathlib import Path
+
+import pandas as pd
+
+from dataset import data_signature
+from datastore import STORE_FILE, StoreWriter, prepare, read_columns, write_store
+from dates import derive_calendar_columns
+from exports import read_export
+
+REPO = Path(__file__).resolve().parents[1]
+EXPORT = Path.joinpath(REPO, 'data', 'campaignfinancedata01202025.csv')
+
+
+def test_prepare_keeps_leading_zeros_in_zip_codes():
+    df = pd.DataFrame({'ZipCode': pd.Series(['02451', '00000', '78209.0', '2138', None], dtype='string')})
+    assert prepare(df)['ZipCode'].tolist() == ['02451', '00000', '78209', '02138', pd.NA]
+
+
+def test_prepare_normalizes_numeric_zip_codes():
+    df = pd.DataFrame({'ZipCode': [2451.0, 78209.0, None]})
+    assert prepare(df)['ZipCode'].tolist() == ['02451', '78209', pd.NA]
+
+
+def test_store_writer_publishes_parts_on_close(tmp_path):
+    store = Path.joinpath(tmp_path, STORE_FILE)
+    df = prepare(derive_calendar_columns(next(read_export(EXPORT))[0]))
+    write_store(df.iloc[:100], store)
+    signature = data_signature(tmp_path)
+    with StoreWriter(store) as writer:
+        writer.append(df.iloc[100:])
+        assert data_signature(tmp_path) == signature
+        assert len(pd.read_parquet(store, columns=['Id'])) == 100
+        assert len(read_columns(store, ['Id'])) == len(df)
+    assert data_signature(tmp_path) != signature
+    assert len(pd.read_parquet(store, columns=['Id'])) == len(df)
+
+
+def test_store_writer_without_rows_leaves_store_unchanged(tmp_path):
+    store = Path.joinpath(tmp_path, STORE_FILE)
+    df = prepare(derive_calendar_columns(next(read_export(EXPORT))[0]))
+    write_store(df, store)
+    signature = data_signature(tmp_path)
+    with StoreWriter(store):
+        pass
+    assert data_signature(tmp_path) == signature
@@ -0,0 +1,57 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from batch_ingest import batch_ingest
+from datastore import read_columns
+from ingest import ingest
+
+REPO = Path(__file__).resolve().parents[1]
+EXPORT = Path.joinpath(REPO, 'data', 'campaignfinancedata01202025.csv')
+
+
+# First rows of the bundled export, some of them without a ReportId
+def export_with_null_report_ids(tmp_path):
+    df = pd.read_csv(EXPORT, dtype=str, nrows=200)
+    df.loc[df.index[::4], 'ReportId'] = None
+    path = Path.joinpath(tmp_path, 'export.csv')
+    df.to_csv(path, index=False)
+    return path
+
+
+def test_reingest_skips_rows_without_report_id(tmp_path):
+    export = export_with_null_report_ids(tmp_path)
+    store = Path.joinpath(tmp_path, 'store')
+    total, added = ingest(export, store)
+    assert added > 0
+    assert ingest(export, store) == (total, 0)
+    assert len(read_columns(store, ['ReportId'])) == added
+
+
+def test_batch_reingest_skips_rows_without_report_id(tmp_path):
+    export = export_with_null_report_ids(tmp_path)
+    store = Path.joinpath(tmp_path, 'store')
+    [(_, _, added)] = batch_ingest([export], store, workers=1)
+    assert added > 0
+    assert batch_ingest([export], store, workers=1)[0][2] == 0
+    assert len(read_columns(store, ['ReportId'])) == added
+
+
+def test_failed_rebuild_keeps_the_store(tmp_path):
+    export = export_with_null_report_ids(tmp_path)
+    store = Path.joinpath(tmp_path, 'store')
+    [(_, _, added)] = batch_ingest([export], store, workers=1)
+    with pytest.raises(ValueError):
+        batch_ingest([export, Path.joinpath(REPO, 'README.md')], store, workers=1, rebuild=True)
+    assert len(read_columns(store, ['ReportId'])) == added
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['export.csv', 'store']
+
+
+def test_rebuild_replaces_the_store(tmp_path):
+    export = export_with_null_report_ids(tmp_path)
+    store = Path.joinpath(tmp_path, 'store')
+    [(_, _, added)] = batch_ingest([export], store, workers=1)
+    assert batch_ingest([export], store, workers=1, rebuild=True)[0][2] == added
+    assert len(read_columns(store, ['ReportId'])) == added
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['export.csv', 'store']
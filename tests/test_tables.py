@@ -0,0 +1,15 @@
+import pandas as pd
+import pytest
+
+from tables import PagedTable
+
+
+@pytest.mark.parametrize('dtype', [object, 'string', 'category'])
+def test_names_sort_case_insensitively_with_missing_last(dtype):
+    names = pd.Series(['bravo', None, 'Alpha', 'charlie', 'None', 'nan'], dtype=dtype)
+    table = PagedTable(pd.DataFrame({'Name:': names}))
+    ascending = table.page(0, 10, [{'column_id': 'Name:', 'direction': 'asc'}])[0]
+    descending = table.page(0, 10, [{'column_id': 'Name:', 'direction': 'desc'}])[0]
+    assert [row['Name:'] for row in ascending][:5] == ['Alpha', 'bravo', 'charlie', 'nan', 'None']
+    assert [row['Name:'] for row in descending][:5] == ['None', 'nan', 'charlie', 'bravo', 'Alpha']
+    assert pd.isna(ascending[-1]['Name:']) and pd.isna(descending[-1]['Name:'])
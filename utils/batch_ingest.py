@@ -0,0 +1,151 @@
+import argparse
+import os
+import sys
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+import pandas as pd
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(Path.joinpath(REPO, 'src')))
+
+from datastore import DATA, STORE_FILE, StoreWriter, clear_store, prepare, read_state, replace_store, updated_state, write_state
+from dates import derive_calendar_columns
+from election25 import clean_election_export
+from exports import CHUNK_ROWS, EXPORT_SCHEMA, BadRowReport, read_export, validate_chunk
+from ingest import after_high_water_mark, drop_ingested
+
+# Inputs a manifest can list: city exports or cleaned CSVs, election
+# workbooks, and zip archives of either
+WORKBOOK_SUFFIXES = {'.xlsx', '.xls'}
+INPUT_SUFFIXES = {'.csv'} | WORKBOOK_SUFFIXES
+
+
+# Input files listed in a manifest: one path per line, relative to the
+# manifest, oldest first; blank lines and '#' comments are skipped
+def read_manifest(path):
+    paths = []
+    for line in Path(path).read_text().splitlines():
+        line = line.split('#', 1)[0].strip()
+        if line:
+            paths.append(Path.joinpath(Path(path).parent, line))
+    return paths
+
+
+# (source, path, zip member) for each input; archives contribute one entry
+# per CSV or workbook inside them, in archive order
+def expand_inputs(paths):
+    inputs = []
+    for path in paths:
+        if Path(path).suffix.lower() != '.zip':
+            inputs.append((str(path), path, None))
+            continue
+        with zipfile.ZipFile(path) as archive:
+            for member in archive.namelist():
+                if Path(member).suffix.lower() in INPUT_SUFFIXES:
+                    inputs.append((f'{path}:{member}', path, member))
+    return inputs
+
+
+# Validated chunks of an input: CSVs are streamed; election workbooks are
+# cleaned whole by election25.py, then validated chunk by chunk
+def read_input(path, chunk_rows=CHUNK_ROWS):
+    if Path(path).suffix.lower() not in WORKBOOK_SUFFIXES:
+        yield from read_export(path, chunk_rows)
+        return
+    df = clean_election_export(path)
+    missing = [column for column in EXPORT_SCHEMA if column not in df.columns]
+    if missing:
+        raise ValueError(f"{path} is missing columns: {', '.join(missing)}")
+    df = df[list(EXPORT_SCHEMA)].reset_index(drop=True)
+    for start in range(0, len(df), chunk_rows):
+        yield validate_chunk(df.iloc[start:start + chunk_rows])
+
+
+# Worker: extract, validate and prepare one input, writing its chunks as
+# Parquet files under `out_dir`. Returns the chunk files, the number of rows
+# read and the rejected rows.
+def clean_input(job, state, chunk_rows):
+    source, path, member, out_dir = job
+    out_dir.mkdir(parents=True)
+    parts, rejected, total = [], [], 0
+    with tempfile.TemporaryDirectory() as extracted:
+        if member is not None:
+            with zipfile.ZipFile(path) as archive:
+                path = archive.extract(member, extracted)
+        for chunk, bad in read_input(path, chunk_rows):
+            total += len(chunk) + len(bad)
+            if not bad.empty:
+                rejected.append(bad)
+            chunk = after_high_water_mark(chunk, state)
+            if chunk.empty:
+                continue
+            part = Path.joinpath(out_dir, f'chunk-{len(parts):05d}.parquet')
+            prepare(derive_calendar_columns(chunk)).to_parquet(part, index=False)
+            parts.append(part)
+    return parts, total, pd.concat(rejected) if rejected else pd.DataFrame()
+
+
+# Ingest a batch of inputs, cleaned in parallel worker processes and merged
+# into the store in input order. Rows already in the store, or in an earlier
+# input of the batch, are dropped by key; candidate and donor ids are assigned
+# as the cleaned chunks are appended, so they do not depend on which worker
+# finishes first. Returns (source, rows read, rows added) per input. With
+# `rebuild` the store is built from scratch in a directory beside it and only
+# swapped in once the whole batch has succeeded.
+def batch_ingest(paths, store_path, workers=None, chunk_rows=CHUNK_ROWS, report=None, rebuild=False):
+    if rebuild:
+        Path(store_path).parent.mkdir(parents=True, exist_ok=True)
+        new_path = Path(tempfile.mkdtemp(prefix=f'.{Path(store_path).name}-', dir=Path(store_path).parent))
+        try:
+            results = batch_ingest(paths, new_path, workers, chunk_rows, report)
+        except BaseException:
+            clear_store(new_path)
+            raise
+        replace_store(new_path, store_path)
+        return results
+    state = read_state(store_path) if Path(store_path).exists() else {}
+    new_state = state
+    inputs = expand_inputs(paths)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp, ProcessPoolExecutor(workers) as pool:
+        jobs = [(source, path, member, Path(tmp, f'{i:05d}')) for i, (source, path, member) in enumerate(inputs)]
+        cleaned = pool.map(clean_input, jobs, repeat(state), repeat(chunk_rows))
+        with StoreWriter(store_path) as writer:
+            for (source, _, _), (parts, total, rejected) in zip(inputs, cleaned):
+                if report is not None:
+                    report.add(source, rejected)
+                added = writer.rows
+                for part in parts:
+                    chunk = drop_ingested(pd.read_parquet(part), store_path)
+                    if not chunk.empty:
+                        writer.append(chunk)
+                        new_state = updated_state(new_state, chunk)
+                    part.unlink()
+                results.append((source, total, writer.rows - added))
+    if new_state is not state:
+        write_state(store_path, new_state)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Ingest a manifest of city exports into the data store in parallel.')
+    parser.add_argument('manifest', help='Text file listing the exports, workbooks and zip archives, oldest first')
+    parser.add_argument('--store', default=str(Path.joinpath(DATA, STORE_FILE)),
+                        help='Store directory (default: data/campaign_finance.parquet)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='Worker processes (default: one per core)')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS,
+                        help=f'Rows read and validated at a time (default: {CHUNK_ROWS})')
+    parser.add_argument('--bad-rows', help='CSV file to write rejected rows to')
+    parser.add_argument('--rebuild', action='store_true', help='Replace the store instead of appending to it')
+    args = parser.parse_args()
+
+    report = BadRowReport(args.bad_rows)
+    for source, total, added in batch_ingest(read_manifest(args.manifest), args.store, args.workers,
+                                             args.chunk_rows, report, args.rebuild):
+        print(f"{source}: {added} new of {total} rows")
+    print(report.summary())
@@ -0,0 +1,32 @@
+import argparse
+import sys
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(Path.joinpath(REPO, 'src')))
+
+from datastore import CSV_FILE, DATA, STORE_FILE, build_store
+from exports import CHUNK_ROWS, BadRowReport
+from dataset import DatasetHolder
+
+# Convert the cleaned campaign finance CSV(s) into the columnar store the app loads
+parser = argparse.ArgumentParser(description='Build the columnar campaign finance store.')
+parser.add_argument('csv', nargs='*', default=[str(Path.joinpath(DATA, CSV_FILE))],
+                    help='Cleaned CSV file(s) to include (default: data/campaign_finance.csv)')
+parser.add_argument('--out', default=str(Path.joinpath(DATA, STORE_FILE)),
+                    help='Output Parquet path (default: data/campaign_finance.parquet)')
+parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS,
+                    help=f'Rows read and validated at a time (default: {CHUNK_ROWS})')
+parser.add_argument('--bad-rows', help='CSV file to write rejected rows to')
+args = parser.parse_args()
+
+report = BadRowReport(args.bad_rows)
+rows = build_store(args.csv, args.out, args.chunk_rows, report)
+
+print(f"Wrote {rows} rows to {args.out}")
+print(report.summary())
+
+# Load the new store once, which saves the layout dimensions the app serves
+# its page from until its own load finishes (PRELOAD_DATA=0)
+if Path(args.out).resolve() == Path.joinpath(DATA, STORE_FILE).resolve():
+    DatasetHolder(DATA).load()
@@ -0,0 +1,206 @@
+import posixpath
+import re
+import zipfile
+from datetime import datetime, timedelta
+from xml.etree.ElementTree import fromstring, iterparse
+
+import pandas as pd
+
+MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+ZIP_CODE_PATTERN = r'\b(\d{5})\b'
+
+# Built-in Excel number formats that display dates/times
+DATE_FORMAT_IDS = set(range(14, 23)) | {45, 46, 47}
+EXCEL_EPOCH = datetime(1899, 12, 30)
+
+
+# 5-digit zip code in each value of a Series (NaN where there is none)
+def extract_zip_codes(values):
+    return values.str.extract(ZIP_CODE_PATTERN, expand=False)
+
+
+# Relationship id -> target for a .rels part (empty if the part is missing)
+def _relationships(archive, rels_path):
+    if rels_path not in archive.namelist():
+        return {}
+    return {rel.get('Id'): rel.get('Target') for rel in fromstring(archive.read(rels_path))}
+
+
+# Path of the workbook's active sheet inside the .xlsx archive
+def _active_sheet_path(archive):
+    workbook = fromstring(archive.read('xl/workbook.xml'))
+    view = workbook.find(f'{{{MAIN_NS}}}bookViews/{{{MAIN_NS}}}workbookView')
+    active = int(view.get('activeTab', 0)) if view is not None else 0
+    sheet = workbook.find(f'{{{MAIN_NS}}}sheets')[active]
+    target = _relationships(archive, 'xl/_rels/workbook.xml.rels')[sheet.get(f'{{{REL_NS}}}id')]
+    if target.startswith('/'):
+        return target.lstrip('/')
+    return posixpath.normpath(posixpath.join('xl', target))
+
+
+def _sheet_rels_path(sheet_path):
+    directory, name = posixpath.split(sheet_path)
+    return posixpath.join(directory, '_rels', f'{name}.rels')
+
+
+# Row numbers covered by a cell reference ('A2') or range ('A2:A5') in `column`
+def _rows_in_ref(ref, column):
+    bounds = [re.fullmatch(r'([A-Z]+)(\d+)', part).groups() for part in ref.split(':')]
+    if bounds[0][0] != column or bounds[-1][0] != column:
+        return range(0)
+    return range(int(bounds[0][1]), int(bounds[-1][1]) + 1)
+
+
+# Hyperlink elements of a sheet part. <hyperlinks> always follows
+# <sheetData>, so the part is scanned in chunks for it and only that fragment
+# (wrapped in the sheet's root tag for its namespace declarations) is parsed.
+def _hyperlink_elements(sheet, chunk_size=1 << 20):
+    head, root = b'', None
+    while root is None:
+        chunk = sheet.read(chunk_size)
+        if not chunk:
+            return []
+        head += chunk
+        root = re.search(rb'<([\w:]*worksheet)\b[^>]*>', head)
+    buffer, fragment = head, None
+    while fragment is None:
+        found = buffer.find(b'<hyperlinks')
+        if found == -1:
+            chunk = sheet.read(chunk_size)
+            if not chunk:
+                return []
+            # keep a tail in case the tag straddles two chunks
+            buffer = buffer[-len(b'<hyperlinks'):] + chunk
+        else:
+            fragment = buffer[found:] + sheet.read()
+    fragment = fragment[:fragment.find(b'</hyperlinks>') + len(b'</hyperlinks>')]
+    document = root.group(0) + fragment + b'</' + root.group(1) + b'>'
+    return fromstring(document).iter(f'{{{MAIN_NS}}}hyperlink')
+
+
+# Row number -> hyperlink target for the cells of one column of the active
+# sheet, read without loading the workbook (memory does not grow with rows)
+def read_hyperlinks(excel_file_path, column='A'):
+    hyperlinks = {}
+    with zipfile.ZipFile(excel_file_path) as archive:
+        sheet_path = _active_sheet_path(archive)
+        targets = _relationships(archive, _sheet_rels_path(sheet_path))
+        with archive.open(sheet_path) as sheet:
+            for element in _hyperlink_elements(sheet):
+                target = targets.get(element.get(f'{{{REL_NS}}}id'))
+                if target:
+                    for row in _rows_in_ref(element.get('ref'), column):
+                        hyperlinks[row] = target
+    return hyperlinks
+
+
+# Hyperlink for each row of a frame read from the same sheet, matched on the
+# sheet row number (header on `header_row`, data from the next row)
+def align_hyperlinks(df, hyperlinks, header_row=1):
+    rows = df.index + header_row + 1
+    return pd.Series(hyperlinks, dtype=object).reindex(rows).to_numpy()
+
+
+# Text of every shared string, in index order
+def _shared_strings(archive):
+    if 'xl/sharedStrings.xml' not in archive.namelist():
+        return []
+    strings = []
+    with archive.open('xl/sharedStrings.xml') as part:
+        for _, element in iterparse(part):
+            if element.tag == f'{{{MAIN_NS}}}si':
+                strings.append(''.join(text.text or '' for text in element.iter(f'{{{MAIN_NS}}}t')))
+                element.clear()
+    return strings
+
+
+# Style indexes (the cell 's' attribute) whose number format is a date
+def _date_styles(archive):
+    if 'xl/styles.xml' not in archive.namelist():
+        return set()
+    styles = fromstring(archive.read('xl/styles.xml'))
+    date_formats = set(DATE_FORMAT_IDS)
+    for fmt in styles.iter(f'{{{MAIN_NS}}}numFmt'):
+        # strip quoted literals and [colour]/[locale] tags before looking for date codes
+        code = re.sub(r'"[^"]*"|\[[^\]]*\]', '', fmt.get('formatCode', '')).lower()
+        if re.search(r'[dmyhs]', code):
+            date_formats.add(int(fmt.get('numFmtId')))
+    cell_formats = styles.find(f'{{{MAIN_NS}}}cellXfs')
+    if cell_formats is None:
+        return set()
+    return {str(index) for index, xf in enumerate(cell_formats)
+            if int(xf.get('numFmtId', 0)) in date_formats}
+
+
+def _column_index(letters):
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - 64
+    return index - 1
+
+
+# Python value of a <c> element, typed the way pandas.read_excel types it
+def _cell_value(cell, strings, date_styles):
+    kind = cell.get('t', 'n')
+    if kind == 'inlineStr':
+        return ''.join(text.text or '' for text in cell.iter(f'{{{MAIN_NS}}}t'))
+    value = cell.findtext(f'{{{MAIN_NS}}}v')
+    if value is None or kind == 'e':
+        return None
+    if kind == 's':
+        return strings[int(value)]
+    if kind == 'str':
+        return value
+    if kind == 'b':
+        return value == '1'
+    number = float(value)
+    if cell.get('s') in date_styles:
+        return EXCEL_EPOCH + timedelta(days=number)
+    return int(number) if number.is_integer() else number
+
+
+# Values of the active sheet as a DataFrame (first row as header) together with
+# row number -> hyperlink target for `hyperlink_column`. The sheet XML is read
+# once: cells are converted as each row ends and the <hyperlinks> block that
+# follows the rows is collected in the same pass.
+def read_workbook(excel_file_path, hyperlink_column='A'):
+    rows, row_numbers, hyperlinks = [], [], {}
+    columns = {}
+    with zipfile.ZipFile(excel_file_path) as archive:
+        sheet_path = _active_sheet_path(archive)
+        targets = _relationships(archive, _sheet_rels_path(sheet_path))
+        strings = _shared_strings(archive)
+        date_styles = _date_styles(archive)
+        with archive.open(sheet_path) as sheet:
+            for _, element in iterparse(sheet):
+                tag = element.tag.rpartition('}')[2]
+                if tag == 'row':
+                    values = {}
+                    for cell in element.iter(f'{{{MAIN_NS}}}c'):
+                        letters = cell.get('r').rstrip('0123456789')
+                        if letters not in columns:
+                            columns[letters] = _column_index(letters)
+                        values[columns[letters]] = _cell_value(cell, strings, date_styles)
+                    rows.append(values)
+                    row_numbers.append(int(element.get('r')))
+                    element.clear()
+                elif tag == 'hyperlink':
+                    target = targets.get(element.get(f'{{{REL_NS}}}id'))
+                    if target:
+                        for row in _rows_in_ref(element.get('ref'), hyperlink_column):
+                            hyperlinks[row] = target
+
+    if not rows:
+        return pd.DataFrame(), hyperlinks
+    width = max(columns.values()) + 1
+    header = [rows[0].get(index) for index in range(width)]
+    data = [[values.get(index) for index in range(width)] for values in rows[1:]]
+    df = pd.DataFrame(data, columns=header)
+    # Keep the index aligned with sheet rows (row n -> index n - header - 1),
+    # leaving blank rows in the middle of the sheet as empty rows
+    df.index = [number - row_numbers[0] - 1 for number in row_numbers[1:]]
+    df = df.reindex(range(df.index.max() + 1)) if len(df) else df
+    df = df.loc[:, [name is not None for name in header]]
+    return df, hyperlinks
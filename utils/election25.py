@@ -1,96 +1,45 @@
-import pandas as pd
-import openpyxl
-import re
-
-# Function to extract hyperlinks from Excel
-def extract_hyperlinks(excel_file_path):
-    wb = openpyxl.load_workbook(excel_file_path)
-    sheet = wb.active
-    hyperlinks = []
-    # Loop through the rows in the first column to find hyperlinks
-    for row in sheet.iter_rows(min_row=1, max_col=1, values_only=False):
-        cell = row[0]
-        if cell.hyperlink:
-            hyperlinks.append(cell.hyperlink.target)
-        else:
-            hyperlinks.append(None)
-    return hyperlinks
+import argparse
+from pathlib import Path
 
-# Function to extract 5-digit zip codes from the "Name:" column
-def extract_zip_code(address):
-    if pd.notna(address):
-        match = re.search(r'\b\d{5}\b', address)
-        if match:
-            return match.group(0)
-    return None
-
-# Path to the Excel file
-excel_file_path = '/Users/jackturek/Documents/Repos/SATX-Campaign-Finance/data/election25data.xls'
+import pandas as pd
 
-# Try to determine file extension
-file_extension = excel_file_path.split('.')[-1].lower()
+from cleaning import align_hyperlinks, extract_zip_codes, read_workbook
 
-# Select the appropriate engine based on the file extension
-if file_extension == 'xls':
-    engine = 'xlrd'
-    print("Using xlrd engine for .xls file")
-elif file_extension == 'xlsx':
-    engine = 'openpyxl'
-    print("Using openpyxl engine for .xlsx file")
-else:
-    # Try both engines
-    print(f"Unknown extension: {file_extension}. Trying xlrd first...")
-    engine = 'xlrd'
 
-try:
-    # Load the Excel file into a DataFrame with specified engine
-    df = pd.read_excel(excel_file_path, engine=engine)
-except Exception as e:
-    if engine == 'xlrd':
-        print(f"Failed with xlrd: {e}. Trying openpyxl...")
-        engine = 'openpyxl'
-        try:
-            df = pd.read_excel(excel_file_path, engine=engine)
-        except Exception as e2:
-            print(f"Failed with openpyxl as well: {e2}")
-            raise
-    else:
-        print(f"Failed with {engine}: {e}")
-        raise
+# Load a city election export. .xlsx workbooks are parsed once for both cell
+# values and report hyperlinks; legacy .xls files carry no readable links.
+def load_export(excel_file_path):
+    if Path(excel_file_path).suffix.lower() == '.xls':
+        return pd.read_excel(excel_file_path, engine='xlrd'), {}
+    return read_workbook(excel_file_path)
 
-print(f"Successfully loaded Excel file using {engine} engine")
 
-# Load the Excel file into a DataFrame
-df = pd.read_excel(excel_file_path)
+# One row per report with its zip code and report link
+def clean_election_export(excel_file_path):
+    df, hyperlinks = load_export(excel_file_path)
 
-# Extract zip codes from the "Name:" column (adjust column name if different)
-df['ZipCode'] = df['Name:'].apply(extract_zip_code).shift(-2)
+    # Extract zip codes from the "Name:" column (adjust column name if different)
+    df['ZipCode'] = extract_zip_codes(df['Name:']).shift(-2)
 
-# Clean the data by retaining only the first row in each block (where 'Report Id:' is not NaN)
-clean_df = df[df['Report Id:'].notna()].copy()
+    # Clean the data by retaining only the first row in each block (where 'Report Id:' is not NaN)
+    clean_df = df[df['Report Id:'].notna()].copy()
 
-# Extract hyperlinks from the Excel file and add to DataFrame
-hyperlinks = extract_hyperlinks(excel_file_path)
+    # Match hyperlinks to the report rows by sheet row number
+    clean_df['ReportLink'] = align_hyperlinks(clean_df, hyperlinks)
+    return clean_df
 
-# Add hyperlinks to the cleaned DataFrame
-clean_hyperlinks = []
-link_idx = 0
-for i in range(len(clean_df)):
-    while link_idx < len(hyperlinks) and hyperlinks[link_idx] is None:
-        link_idx += 1
-    if link_idx < len(hyperlinks):
-        clean_hyperlinks.append(hyperlinks[link_idx])
-        link_idx += 1
-    else:
-        clean_hyperlinks.append(None)
 
-clean_df['ReportLink'] = clean_hyperlinks
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Clean a city campaign finance election export.')
+    parser.add_argument('excel', help='Export workbook (.xlsx or .xls)')
+    parser.add_argument('--out', default='election2025.csv', help='Output CSV (default: election2025.csv)')
+    parser.add_argument('--keep-links', action='store_true', help='Keep the ReportLink column in the output')
+    args = parser.parse_args()
 
-# Save the final cleaned DataFrame without the report links
-# Filter out the ReportLink column before saving
-final_df = clean_df.drop(columns=['ReportLink'])
+    clean_df = clean_election_export(args.excel)
 
-# Save the final cleaned DataFrame as a new CSV
-final_df.to_csv('election2025.csv', index=False)
+    # Save the final cleaned DataFrame, without the report links unless asked
+    final_df = clean_df if args.keep_links else clean_df.drop(columns=['ReportLink'])
+    final_df.to_csv(args.out, index=False)
 
-print("Processing complete. File saved as 'election2025.csv'")
\ No newline at end of file
+    print(f"Processing complete. File saved as '{args.out}'")
@@ -0,0 +1,123 @@
+import argparse
+import hashlib
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pdfplumber
+
+COLUMNS = ['date', 'name', 'amount', 'type']
+
+CONTRIBUTION_LINE = re.compile(r'^(\d{1,2}/\d{1,2}/\d{4}).*?([\d,]+\.\d{2})$')
+EXPENDITURE_LINE = re.compile(r'^(\d{1,2}/\d{1,2}/\d{4})\s+(.+)$')
+AMOUNT_LINE = re.compile(r'^([\d,]+\.\d{2})\b')
+
+
+# Schedule A1: monetary political contributions (date ... amount, name on the line above)
+def _contributions(lines):
+    records = []
+    for i, line in enumerate(lines):
+        m = CONTRIBUTION_LINE.match(line.strip())
+        if m:
+            date_str, amt_str = m.groups()
+            records.append({
+                'date': pd.to_datetime(date_str, format='%m/%d/%Y'),
+                'name': lines[i-1].strip(),
+                'amount': float(amt_str.replace(',', '')),
+                'type': 'Contribution'
+            })
+    return records
+
+
+# Schedule F1: political expenditures (date payee, amount within the next 5 lines)
+def _expenditures(lines):
+    records = []
+    for i, line in enumerate(lines):
+        m1 = EXPENDITURE_LINE.match(line.strip())
+        if m1:
+            date_str, payee = m1.groups()
+            amount = None
+            for j in range(i+1, min(i+6, len(lines))):
+                m2 = AMOUNT_LINE.match(lines[j].strip())
+                if m2:
+                    amount = float(m2.group(1).replace(',', ''))
+                    break
+            if amount is not None:
+                records.append({
+                    'date': pd.to_datetime(date_str, format='%m/%d/%Y'),
+                    'name': payee.strip(),
+                    'amount': amount,
+                    'type': 'Expenditure'
+                })
+    return records
+
+
+# Contributions and expenditures from one filing. Each page's text is
+# extracted once and checked for both schedules; F1 pages run from the first
+# page marked F1 to the end of the filing.
+def parse_filing(pdf_path):
+    contrib_records = []
+    exp_records = []
+    in_f1 = False
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            text = page.extract_text()
+            if not text:
+                continue
+            lines = text.split('\n')
+            if 'MONETARY POLITICAL CONTRIBUTIONS' in text:
+                contrib_records.extend(_contributions(lines))
+            if any(line.strip() == 'F1:' or 'Schedule F1' in line for line in lines):
+                in_f1 = True
+            if in_f1:
+                exp_records.extend(_expenditures(lines))
+    return pd.DataFrame(contrib_records + exp_records, columns=COLUMNS)
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Parse a filing unless a result for the same content is already cached
+def parse_cached(pdf_path, cache_dir):
+    cache_path = Path.joinpath(Path(cache_dir), f'{file_hash(pdf_path)}.parquet')
+    if cache_path.exists():
+        return pd.read_parquet(cache_path)
+    records = parse_filing(pdf_path)
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    # write then rename so a crashed or concurrent run never leaves half a file
+    tmp_path = cache_path.with_suffix(f'.{os.getpid()}.tmp')
+    records.to_parquet(tmp_path, index=False)
+    tmp_path.replace(cache_path)
+    return records
+
+
+# Parse every PDF in a directory across a process pool, one file per task
+def parse_directory(directory, cache_dir=None, workers=None):
+    pdf_paths = sorted(Path(directory).glob('*.pdf'))
+    cache_dir = cache_dir or Path.joinpath(Path(directory), '.parsed')
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(parse_cached, pdf_paths, [cache_dir] * len(pdf_paths))
+        frames = [records.assign(file=pdf_path.name) for pdf_path, records in zip(pdf_paths, results)]
+    if not frames:
+        return pd.DataFrame(columns=COLUMNS + ['file'])
+    return pd.concat(frames, ignore_index=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Extract Schedule A1/F1 records from a directory of filing PDFs.')
+    parser.add_argument('directory', help='Directory of filing PDFs (e.g. cached ReportLink downloads)')
+    parser.add_argument('--out', default='filings_schedule.csv', help='Output CSV (default: filings_schedule.csv)')
+    parser.add_argument('--cache-dir', help='Parsed-result cache (default: <directory>/.parsed)')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: one per CPU)')
+    args = parser.parse_args()
+
+    df = parse_directory(args.directory, args.cache_dir, args.workers)
+    df.to_csv(args.out, index=False)
+    print(f"Parsed {df['file'].nunique()} filings into {len(df)} records. Saved to '{args.out}'")
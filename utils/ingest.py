@@ -0,0 +1,85 @@
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.compute as pc
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(Path.joinpath(REPO, 'src')))
+
+from datastore import (DATA, KEY_COLUMNS, STORE_FILE, StoreWriter, prepare, read_columns, read_state, updated_state,
+                       write_state, written_parts)
+from dates import derive_calendar_columns
+from exports import CHUNK_ROWS, BadRowReport, read_export
+
+
+# Rows filed after the high-water mark. CreatedDt: is compared inclusively so
+# filings from the boundary day are re-checked; de-duplication drops repeats.
+def after_high_water_mark(df, state):
+    if not state:
+        return df
+    mask = df['ReportId'].isna()
+    if 'ReportId' in state:
+        mask |= df['ReportId'] > state['ReportId']
+    if 'CreatedDt:' in state:
+        mask |= df['CreatedDt:'] >= pd.Timestamp(state['CreatedDt:'])
+    return df[mask]
+
+
+# Drop rows already in the store (or repeated within the batch) by key. Only
+# the keys of reports present in the batch are read back from the store, plus
+# the stored rows without a ReportId when the batch has some (they are never
+# behind the high-water mark, so only the key merge catches repeats).
+def drop_ingested(df, store_path):
+    df = df.drop_duplicates(KEY_COLUMNS)
+    if not written_parts(store_path) or df.empty:
+        return df
+    reports = pc.field('ReportId').isin(df['ReportId'].dropna().unique().tolist())
+    if df['ReportId'].isna().any():
+        reports |= pc.field('ReportId').is_null()
+    existing = read_columns(store_path, KEY_COLUMNS, filters=reports)
+    existing = existing.astype(object).drop_duplicates()
+    keys = df[KEY_COLUMNS].astype(object)
+    seen = keys.merge(existing, on=KEY_COLUMNS, how='left', indicator=True)['_merge'] == 'both'
+    return df[~seen.to_numpy()]
+
+
+# Append the new filings in an export to the store and its rollups, streaming
+# the export in validated chunks (rejected rows go to `report`). Each chunk is
+# de-duplicated against the store, including the chunks already written.
+def ingest(export_path, store_path, chunk_rows=CHUNK_ROWS, report=None):
+    state = read_state(store_path) if Path(store_path).exists() else {}
+    new_state = state
+    total = 0
+    with StoreWriter(store_path) as writer:
+        for chunk, rejected in read_export(export_path, chunk_rows):
+            total += len(chunk) + len(rejected)
+            if report is not None:
+                report.add(export_path, rejected)
+            chunk = after_high_water_mark(chunk, state)
+            chunk = prepare(derive_calendar_columns(chunk))
+            chunk = drop_ingested(chunk, store_path)
+            if not chunk.empty:
+                writer.append(chunk)
+                new_state = updated_state(new_state, chunk)
+    if new_state is not state:
+        write_state(store_path, new_state)
+    return total, writer.rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Append new filings from a city export to the data store.')
+    parser.add_argument('export', nargs='+', help='City campaign finance export CSV(s), oldest first')
+    parser.add_argument('--store', default=str(Path.joinpath(DATA, STORE_FILE)),
+                        help='Store directory (default: data/campaign_finance.parquet)')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS,
+                        help=f'Rows read and validated at a time (default: {CHUNK_ROWS})')
+    parser.add_argument('--bad-rows', help='CSV file to write rejected rows to')
+    args = parser.parse_args()
+
+    report = BadRowReport(args.bad_rows)
+    for export_path in args.export:
+        total, added = ingest(export_path, args.store, args.chunk_rows, report)
+        print(f"{export_path}: {added} new of {total} rows")
+    print(report.summary())